@@ -1,9 +1,10 @@
 from __future__ import annotations
 
-import inspect
+import os
+import threading
 import time
 import traceback
-import uuid
+from functools import lru_cache, partial
 from typing import Any, Optional, Callable
 
 from pydantic import BaseModel
@@ -11,7 +12,6 @@ from pydantic import BaseModel
 from agents import Agent, RunResult, OpenAIChatCompletionsModel
 from agents.run_context import TContext
 from echoagent.agent.tracking.events import (
-    RunEvent,
     RUN_START,
     USER_MESSAGE,
     MODEL_OUTPUT,
@@ -23,11 +23,13 @@ from echoagent.agent.prompting.instruction_builder import InstructionBuilder
 from echoagent.agent.output_handler import OutputHandler
 from echoagent.agent.runner import AgentRunner, ExecutorRunner
 from echoagent.agent.runtime_config import RuntimeConfig
+from echoagent.agent.tracker import get_current_tracker
 from echoagent.agent.tracking.state_recorder import StateRecorder
 from echoagent.utils.llm_setup import model_supports_json_and_tool_calls
 from echoagent.utils.parsers import create_type_parser
 from echoagent.context.state import identity_wrapper
 from echoagent.utils.helpers import extract_final_output
+from echoagent.profiles.base import ToolAgentOutput
 from echoagent.profiles.loader import resolve_profile
 from echoagent.profiles.runtime import (
     normalize_model,
@@ -38,6 +40,14 @@ from echoagent.profiles.runtime import (
 from echoagent.artifacts import record_llm_output, record_parse_failure
 
 
+# agent_kwargs 中参与 profile 解析的字段
+_RESOLUTION_KEYS = frozenset(
+    {"instructions", "tools", "output_schema", "policies", "provider", "base_url", "api_key_env", "params"}
+)
+# agent_kwargs 中仅影响运行期配置的字段
+_RUNTIME_KEYS = frozenset({"mcp_servers", "mcp_server_names"})
+
+
 class EchoAgent(Agent[TContext]):
     """Augmented Agent class with context-aware capabilities.
 
@@ -62,8 +72,41 @@ class EchoAgent(Agent[TContext]):
             tools=[custom_tool],  # Overrides profile tools
             model="gpt-4-turbo"   # Overrides llm parameter
         )
+
+    Profiles are resolved on every construction, so edits to ``context.profiles``
+    or to registered profile data apply to agents created afterwards with no cache
+    invalidation. The only class-level cache holds string parsers keyed by output
+    schema class; ``clear_template_cache()`` drops it (e.g. between tests).
     """
 
+    # 基类 Agent 保留 __dict__；这里的 slots 仅承载 EchoAgent 自有属性
+    __slots__ = (
+        "output_parser",
+        "_context",
+        "_identifier",
+        "_profile",
+        "_runtime_config",
+        "_policies",
+        "_parse_mode",
+        "_context_wrappers",
+        "instruction_builder",
+        "output_handler",
+        "_static_instructions",
+        "_runner",
+        "_runner_open",
+        "_runner_close",
+        "_runner_run",
+        "_tracker",
+        "_run_meta",
+        "_needs_parse_output",
+        "_is_tool_agent",
+        "_default_span_type",
+        "_default_printer_key",
+        "_default_printer_title",
+        "_default_output_model",
+        "_step_defaults_source",
+    )
+
     def __init__(
         self,
         context: Any,
@@ -96,29 +139,12 @@ class EchoAgent(Agent[TContext]):
         resolved_identifier = profile
 
         agent_kwargs_copy = dict(agent_kwargs)
-        resolution_overrides: dict[str, Any] = {}
-        runtime_overrides: dict[str, Any] = {}
-
-        if "instructions" in agent_kwargs_copy:
-            resolution_overrides["instructions"] = agent_kwargs_copy.pop("instructions")
-        if "tools" in agent_kwargs_copy:
-            resolution_overrides["tools"] = agent_kwargs_copy.pop("tools")
-        if "output_schema" in agent_kwargs_copy:
-            resolution_overrides["output_schema"] = agent_kwargs_copy.pop("output_schema")
-        if "policies" in agent_kwargs_copy:
-            resolution_overrides["policies"] = agent_kwargs_copy.pop("policies")
-        if "provider" in agent_kwargs_copy:
-            resolution_overrides["provider"] = agent_kwargs_copy.pop("provider")
-        if "base_url" in agent_kwargs_copy:
-            resolution_overrides["base_url"] = agent_kwargs_copy.pop("base_url")
-        if "api_key_env" in agent_kwargs_copy:
-            resolution_overrides["api_key_env"] = agent_kwargs_copy.pop("api_key_env")
-        if "params" in agent_kwargs_copy:
-            resolution_overrides["params"] = agent_kwargs_copy.pop("params")
-        if "mcp_servers" in agent_kwargs_copy:
-            runtime_overrides["mcp_servers"] = agent_kwargs_copy.pop("mcp_servers")
-        if "mcp_server_names" in agent_kwargs_copy:
-            runtime_overrides["mcp_server_names"] = agent_kwargs_copy.pop("mcp_server_names")
+        resolution_overrides: dict[str, Any] = {
+            key: agent_kwargs_copy.pop(key) for key in _RESOLUTION_KEYS & agent_kwargs_copy.keys()
+        }
+        runtime_overrides: dict[str, Any] = {
+            key: agent_kwargs_copy.pop(key) for key in _RUNTIME_KEYS & agent_kwargs_copy.keys()
+        }
 
         model_override = agent_kwargs_copy.pop("model", llm)
         if "provider" not in resolution_overrides:
@@ -127,43 +153,30 @@ class EchoAgent(Agent[TContext]):
                 resolution_overrides["provider"] = provider_hint
         resolution_overrides["model"] = model_override
 
-        resolved_profile = resolve_profile(
+        # 每个实例都重新解析：profile 来源可能被原地修改，解析结果（pydantic 模型）也不在实例间共享
+        resolved_profile, policies, tool_specs, model_spec, tools, output_parser, output_type = _resolve_and_normalize(
             resolved_identifier,
             resolution_overrides,
-            profile_data=profile_source,
+            profile_source,
         )
-        if resolved_profile.id is None:
-            resolved_profile.id = resolved_identifier
+        if model_spec.model is None:
+            raise ValueError("Profile model is required")
 
         runtime_config = RuntimeConfig.from_profile_input(
             resolved_profile,
             overrides=runtime_overrides,
         )
-
-        policies = normalize_policies(resolved_profile.policies)
-        tool_specs = normalize_tools(list(resolved_profile.tools or []), policies.on_tool_name_conflict)
-        model_spec = normalize_model(resolved_profile.model)
-        if model_spec.model is None or (isinstance(model_spec.model, str) and not model_spec.model.strip()):
-            raise ValueError("Profile model is required")
-        tools = runtime_tools(tool_specs)
         base_agent_kwargs = {
             "instructions": resolved_profile.instructions,
-            "tools": tools,
+            "tools": list(tools),
             "model": model_spec.model,
         }
 
         if runtime_config.mcp_servers:
-            base_agent_kwargs["mcp_servers"] = runtime_config.mcp_servers
+            base_agent_kwargs["mcp_servers"] = list(runtime_config.mcp_servers)
 
-        # Handle output schema and parser
-        output_parser = None
-        output_schema = resolved_profile.output_schema
-
-        if output_schema:
-            if not model_supports_json_and_tool_calls(model_spec):
-                output_parser = create_type_parser(output_schema)
-            else:
-                base_agent_kwargs["output_type"] = output_schema
+        if output_type is not None:
+            base_agent_kwargs["output_type"] = output_type
 
         # Determine final agent name
         agent_name = resolved_identifier if resolved_identifier.endswith("_agent") else f"{resolved_identifier}_agent"
@@ -184,13 +197,53 @@ class EchoAgent(Agent[TContext]):
         self._profile = resolved_profile  # Resolved profile for runtime templates
         self._runtime_config = runtime_config
         self._policies = policies
+        self._parse_mode = policies.output_parse_mode if policies else "lenient"
+        # 仅旧式字符串解析器需要 parse_output；调用方据此跳过协程调度
+        self._needs_parse_output = bool(output_parser) and self.output_type is None
 
         self._context_wrappers = {}
         self.instruction_builder = instruction_builder or InstructionBuilder()
         self.output_handler = output_handler or OutputHandler()
+        static_instructions = getattr(self.instruction_builder, "static_instructions", None)
+        self._static_instructions = static_instructions(resolved_profile) if callable(static_instructions) else None
         self._runner = runner or ExecutorRunner()
+        runner_open = getattr(self._runner, "open", None)
+        runner_close = getattr(self._runner, "close", None)
+        self._runner_open = runner_open if callable(runner_open) else None
+        self._runner_close = runner_close if callable(runner_close) else None
+        self._runner_run = self._runner.run
         self._tracker = tracker
+        self._step_defaults_source: Optional[tuple[str, bool]] = None
+        self._refresh_step_defaults()
+
+    def _refresh_step_defaults(self) -> None:
+        """Recompute run meta and span/printer defaults when ``name`` or ``tools`` changed.
+
+        Both are public, mutable fields on the SDK ``Agent``; the derived values are
+        cached and only rebuilt when ``(name, bool(tools))`` differs from the last call.
+        """
+        name = self.name
+        is_tool_agent = bool(self.tools)
+        source = (name, is_tool_agent)
+        if source == self._step_defaults_source:
+            return
+        self._step_defaults_source = source
+        # 事件 payload 共享此 dict；StateRecorder 只读，ContextEvent 校验时会复制
+        self._run_meta = {"agent_name": name, "profile_name": self._identifier}
+        self._is_tool_agent = is_tool_agent
+        self._default_span_type = "tool" if is_tool_agent else "agent"
+        self._default_printer_key = f"tool:{name}" if is_tool_agent else None
+        self._default_printer_title = f"Tool: {name}" if is_tool_agent else None
+        self._default_output_model = ToolAgentOutput if is_tool_agent else None
     
+    @classmethod
+    def clear_template_cache(cls) -> None:
+        """Drop cached output-schema parsers.
+
+        Parsers depend only on the schema class, so profile changes never require this.
+        """
+        _cached_type_parser.cache_clear()
+
     def register_context_wrapper(self, field_name: str, wrapper: Callable[[Any], Any] = identity_wrapper) -> None:
         """Register a context wrapper for a context field."""
         self._context_wrappers[field_name] = wrapper
@@ -221,18 +274,21 @@ class EchoAgent(Agent[TContext]):
         Note:
             This method requires self._context to be set.
         """
+        if self._static_instructions is not None:
+            return self._static_instructions
         state = self._context.state
         profile = getattr(self, "_profile", None)
         return self.instruction_builder.build(
             state,
             profile,
-            runtime={"payload": payload},
+            payload=payload,
         )
 
-    def _get_artifact_store(self, tracker: Optional[Any]) -> Optional[Any]:
+    def _get_artifact_store(self, tracker: Optional[Any], settings: Optional[Any] = None) -> Optional[Any]:
         if tracker is None:
             return None
-        settings = getattr(tracker, "artifact_settings", None)
+        if settings is None:
+            settings = getattr(tracker, "artifact_settings", None)
         if not settings or not getattr(settings, "enabled", False):
             return None
         get_store = getattr(tracker, "get_run_artifact_store", None)
@@ -250,15 +306,16 @@ class EchoAgent(Agent[TContext]):
         exception: Optional[BaseException],
         run_id: Optional[str],
         handler_name: str,
+        settings: Optional[Any] = None,
     ) -> None:
         if tracker is None:
             return
-        settings = getattr(tracker, "artifact_settings", None)
-        if not settings or not getattr(settings, "debug_enabled", False):
+        if settings is None:
+            settings = getattr(tracker, "artifact_settings", None)
+        _, save_parse_failures = _artifact_flags(settings)
+        if not save_parse_failures:
             return
-        if not getattr(settings, "save_parse_failures", False):
-            return
-        store = self._get_artifact_store(tracker)
+        store = self._get_artifact_store(tracker, settings)
         if store is None:
             return
         error_payload: Optional[dict[str, Any]] = None
@@ -277,12 +334,9 @@ class EchoAgent(Agent[TContext]):
             error_message = str(exception)
         if error_type is None and exception is not None:
             error_type = exception.__class__.__name__
-        traceback_text = None
-        if exception is not None:
-            traceback_text = "".join(
-                traceback.format_exception(type(exception), exception, exception.__traceback__)
-            )
-        ref = record_parse_failure(
+        traceback_text = _LazyTraceback(exception) if exception is not None else None
+        write = partial(
+            record_parse_failure,
             raw_output,
             store=store,
             run_id=run_id or "",
@@ -296,9 +350,7 @@ class EchoAgent(Agent[TContext]):
             error_detail=error_payload,
             path_prefix="debug",
         )
-        record = getattr(tracker, "record_artifact", None)
-        if callable(record):
-            record(ref, event_type="parse_failure")
+        _submit_artifact_write(tracker, write, "parse_failure")
 
     def _save_llm_output_artifact(
         self,
@@ -306,25 +358,27 @@ class EchoAgent(Agent[TContext]):
         output: Any,
         *,
         run_id: Optional[str],
+        settings: Optional[Any] = None,
     ) -> None:
         if tracker is None:
             return
-        settings = getattr(tracker, "artifact_settings", None)
-        if not settings or not getattr(settings, "save_llm_output", False):
+        if settings is None:
+            settings = getattr(tracker, "artifact_settings", None)
+        save_llm_output, _ = _artifact_flags(settings)
+        if not save_llm_output:
             return
-        store = self._get_artifact_store(tracker)
+        store = self._get_artifact_store(tracker, settings)
         if store is None:
             return
-        ref = record_llm_output(
+        write = partial(
+            record_llm_output,
             output,
             store=store,
             run_id=run_id or "",
             agent_name=getattr(self, "name", ""),
             profile_name=getattr(self, "_identifier", None),
         )
-        record = getattr(tracker, "record_artifact", None)
-        if callable(record):
-            record(ref, event_type="llm_output")
+        _submit_artifact_write(tracker, write, "llm_output")
 
 
     async def __call__(
@@ -361,84 +415,87 @@ class EchoAgent(Agent[TContext]):
             Parsed output if in pipeline context, otherwise RunResult
         """
         state = getattr(self._context, "state", None)
-        instructions = self.instruction_builder.build(
-            state,
-            self._profile,
-            runtime={"payload": payload},
-        )
+        if self._static_instructions is not None:
+            instructions = self._static_instructions
+        else:
+            instructions = self.instruction_builder.build(
+                state,
+                self._profile,
+                payload=payload,
+            )
 
         # Auto-detect tracker from context if not explicitly provided
         if tracker is None:
             tracker = self._tracker
         if tracker is None:
-            from echoagent.agent.tracker import get_current_tracker
             tracker = get_current_tracker()
 
         # If tracker is available (explicitly or from context), use agent_step for full tracking
         if tracker:
             async def _call_runner_hook(hook, **kwargs: Any) -> None:
-                if not callable(hook):
+                if hook is None:
                     return
                 result = hook(**kwargs)
-                if inspect.isawaitable(result):
+                if hasattr(result, "__await__"):
                     await result
 
-            is_tool_agent = bool(self.tools)
-            resolved_span_name = span_name or self.name
-            resolved_span_type = span_type or ("tool" if is_tool_agent else "agent")
-
-            resolved_printer_key = printer_key or (f"tool:{resolved_span_name}" if is_tool_agent else None)
-            resolved_printer_title = printer_title or (f"Tool: {resolved_span_name}" if is_tool_agent else None)
-
-            resolved_output_model = output_model
-            if resolved_output_model is None and is_tool_agent:
-                from echoagent.profiles.base import ToolAgentOutput
-
-                resolved_output_model = ToolAgentOutput
+            self._refresh_step_defaults()
+            is_tool_agent = self._is_tool_agent
+            resolved_span_type = span_type or self._default_span_type
+            if span_name is None:
+                resolved_span_name = self.name
+                resolved_printer_key = printer_key or self._default_printer_key
+                resolved_printer_title = printer_title or self._default_printer_title
+            else:
+                resolved_span_name = span_name or self.name
+                resolved_printer_key = printer_key or (f"tool:{resolved_span_name}" if is_tool_agent else None)
+                resolved_printer_title = printer_title or (f"Tool: {resolved_span_name}" if is_tool_agent else None)
+            resolved_output_model = output_model or self._default_output_model
 
             resolved_record_payload = record_payload if record_payload is not None else is_tool_agent
 
-            run_meta = {
-                "agent_name": self.name,
-                "profile_name": self._identifier,
-            }
+            run_meta = self._run_meta
             if self._profile:
-                run_meta["resolved_profile"] = self._profile.to_debug_dict()
+                run_meta = {**run_meta, "resolved_profile": self._profile.to_debug_dict()}
             tracker.on_run_start(state, run_meta)
 
-            run_id = str(uuid.uuid4())
+            run_id = _new_run_id()
             workflow_run_id = getattr(tracker, "run_id", None) or getattr(tracker, "experiment_id", None)
-            events: list[RunEvent] = []
+            artifact_settings = getattr(tracker, "artifact_settings", None)
+            _now = time.time_ns
+            events: list[tuple[str, dict[str, Any], int, str]] = []
             state_recorder = StateRecorder()
             events.append(
-                RunEvent(
-                    type=RUN_START,
-                    payload={"agent_name": self.name, "profile_name": self._identifier},
-                    ts=time.time(),
-                    run_id=run_id,
+                (
+                    RUN_START,
+                    self._run_meta,
+                    _now(),
+                    run_id,
                 )
             )
-            payload_text = self.instruction_builder._serialize_payload(payload)
+            if payload is None:
+                payload_text = None
+            elif type(payload) is str:
+                payload_text = payload
+            else:
+                payload_text = self.instruction_builder._serialize_payload(payload)
             if payload_text:
                 events.append(
-                    RunEvent(
-                        type=USER_MESSAGE,
-                        payload={
+                    (
+                        USER_MESSAGE,
+                        {
                             "content": payload_text,
-                            "meta": {
-                                "agent_name": self.name,
-                                "profile_name": self._identifier,
-                            },
+                            "meta": self._run_meta,
                         },
-                        ts=time.time(),
-                        run_id=run_id,
+                        _now(),
+                        run_id,
                     )
                 )
 
             status = "success"
             try:
-                await _call_runner_hook(getattr(self._runner, "open", None), runtime_config=self._runtime_config)
-                result = await self._runner.run(
+                await _call_runner_hook(self._runner_open, runtime_config=self._runtime_config)
+                result = await self._runner_run(
                     tracker=tracker,
                     agent=self,
                     instructions=instructions,
@@ -455,22 +512,18 @@ class EchoAgent(Agent[TContext]):
                 # if self.name == "web_searcher_agent":
                 #     import ipdb; ipdb.set_trace()
 
-                if resolved_output_model and isinstance(result, resolved_output_model):
+                if resolved_output_model is None:
+                    final_output = extract_final_output(result)
+                elif isinstance(result, resolved_output_model):
                     final_output = result
                 else:
                     final_output = extract_final_output(result)
-                    if (
-                        resolved_output_model
-                        and not isinstance(final_output, resolved_output_model)
-                    ):
-                        parse_mode = "lenient"
-                        if getattr(self, "_policies", None):
-                            parse_mode = self._policies.output_parse_mode
+                    if not isinstance(final_output, resolved_output_model):
                         try:
                             parsed = self.output_handler.parse(
                                 final_output,
                                 schema=resolved_output_model,
-                                mode=parse_mode,
+                                mode=self._parse_mode,
                             )
                         except Exception as exc:  # noqa: BLE001 - re-raise after observability
                             schema_name = self.output_handler._schema_name(resolved_output_model)
@@ -491,32 +544,33 @@ class EchoAgent(Agent[TContext]):
                                 exception=exc,
                                 run_id=workflow_run_id,
                                 handler_name="OutputHandler",
+                                settings=artifact_settings,
                             )
                             events.append(
-                                RunEvent(
-                                    type=PARSE_RESULT,
-                                    payload={
+                                (
+                                    PARSE_RESULT,
+                                    {
                                         "ok": False,
                                         "error": str(exc),
                                         "model_name": schema_name,
                                         "error_detail": error_detail.to_dict(),
                                     },
-                                    ts=time.time(),
-                                    run_id=run_id,
+                                    _now(),
+                                    run_id,
                                 )
                             )
                             raise
                         events.append(
-                            RunEvent(
-                                type=PARSE_RESULT,
-                                payload={
+                            (
+                                PARSE_RESULT,
+                                {
                                     "ok": parsed.ok,
                                     "error": parsed.error,
                                     "model_name": parsed.model_name,
                                     "error_detail": parsed.error_detail.to_dict() if parsed.error_detail else None,
                                 },
-                                ts=time.time(),
-                                run_id=run_id,
+                                _now(),
+                                run_id,
                             )
                         )
                         if not parsed.ok and parsed.error and tracker:
@@ -532,22 +586,22 @@ class EchoAgent(Agent[TContext]):
                                 exception=None,
                                 run_id=workflow_run_id,
                                 handler_name="OutputHandler",
+                                settings=artifact_settings,
                             )
                         final_output = parsed.value
 
                 events.append(
-                    RunEvent(
-                        type=MODEL_OUTPUT,
-                        payload={
+                    (
+                        MODEL_OUTPUT,
+                        {
                             "output": final_output,
                             "record_payload": resolved_record_payload,
                             "record_tool_output": is_tool_agent,
-                            "agent_name": self.name,
-                            "profile_name": self._identifier,
+                            **self._run_meta,
                             "tool_name": self.name if is_tool_agent else None,
                         },
-                        ts=time.time(),
-                        run_id=run_id,
+                        _now(),
+                        run_id,
                     )
                 )
                 tracker.on_model_output(
@@ -556,53 +610,61 @@ class EchoAgent(Agent[TContext]):
                     record_payload=resolved_record_payload,
                     record_tool_output=is_tool_agent,
                 )
-                self._save_llm_output_artifact(tracker, final_output, run_id=workflow_run_id)
+                self._save_llm_output_artifact(
+                    tracker,
+                    final_output,
+                    run_id=workflow_run_id,
+                    settings=artifact_settings,
+                )
 
                 return final_output
             except Exception as exc:
                 status = "error"
                 events.append(
-                    RunEvent(
-                        type=ERROR,
-                        payload={"error": exc},
-                        ts=time.time(),
-                        run_id=run_id,
+                    (
+                        ERROR,
+                        {"error": exc},
+                        _now(),
+                        run_id,
                     )
                 )
                 tracker.on_error(state, exc)
                 raise
             finally:
                 events.append(
-                    RunEvent(
-                        type=RUN_END,
-                        payload={"status": status},
-                        ts=time.time(),
-                        run_id=run_id,
+                    (
+                        RUN_END,
+                        {"status": status},
+                        _now(),
+                        run_id,
                     )
                 )
                 state_recorder.consume(self._context, events)
                 try:
-                    await _call_runner_hook(getattr(self._runner, "close", None))
+                    await _call_runner_hook(self._runner_close)
                 except Exception:
                     pass
-                tracker.on_run_end(state, run_meta)
+                # artifact 落盘失败或被取消时也必须走到 on_run_end，且不掩盖原始异常
+                try:
+                    flush = getattr(tracker, "flush_artifacts", None)
+                    if flush is not None:
+                        await flush()
+                except Exception:
+                    pass
+                finally:
+                    tracker.on_run_end(state, run_meta)
 
 
     async def parse_output(self, run_result: RunResult) -> RunResult:
         """Apply legacy string parser only when no structured output is configured."""
         if self.output_parser and self.output_type is None:
-            parse_mode = "lenient"
-            if getattr(self, "_policies", None):
-                parse_mode = self._policies.output_parse_mode
             try:
                 parsed = self.output_handler.parse(
                     run_result.final_output,
                     schema=self.output_parser,
-                    mode=parse_mode,
+                    mode=self._parse_mode,
                 )
             except Exception as exc:  # noqa: BLE001 - re-raise after observability
-                from echoagent.agent.tracker import get_current_tracker
-
                 tracker = get_current_tracker()
                 if tracker:
                     workflow_run_id = getattr(tracker, "run_id", None) or getattr(tracker, "experiment_id", None)
@@ -627,8 +689,6 @@ class EchoAgent(Agent[TContext]):
                     )
                 raise
             if not parsed.ok and parsed.error:
-                from echoagent.agent.tracker import get_current_tracker
-
                 tracker = get_current_tracker()
                 if tracker:
                     workflow_run_id = getattr(tracker, "run_id", None) or getattr(tracker, "experiment_id", None)
@@ -649,9 +709,130 @@ class EchoAgent(Agent[TContext]):
         return run_result
 
 
+# 模型类型 -> provider；新增模型类型时在此登记
+_PROVIDER_BY_TYPE: dict[type, str] = {OpenAIChatCompletionsModel: "openai_compatible"}
+
+
 def _infer_provider_from_model(model: Any) -> Optional[str]:
     if model is None or isinstance(model, str):
         return None
-    if isinstance(model, OpenAIChatCompletionsModel):
-        return "openai_compatible"
+    model_type = type(model)
+    provider = _PROVIDER_BY_TYPE.get(model_type)
+    if provider is not None:
+        return provider
+    # 子类按 MRO 回退查找
+    for base in model_type.__mro__[1:]:
+        provider = _PROVIDER_BY_TYPE.get(base)
+        if provider is not None:
+            return provider
     return None
+
+
+_RUN_ID_BYTES = 16
+_RUN_ID_POOL_SIZE = 4096
+_run_id_pool = b""
+_run_id_pos = 0
+_run_id_lock = threading.Lock()
+
+
+def _reset_run_id_pool() -> None:
+    global _run_id_pool, _run_id_pos
+    _run_id_pool = b""
+    _run_id_pos = 0
+
+
+if hasattr(os, "register_at_fork"):
+    # 子进程不能复用父进程剩余的随机字节，否则 run_id 会重复
+    os.register_at_fork(after_in_child=_reset_run_id_pool)
+
+
+def _new_run_id() -> str:
+    """生成 32 位十六进制 run_id，批量读取 urandom 以摊薄系统调用。"""
+    global _run_id_pool, _run_id_pos
+    with _run_id_lock:
+        if _run_id_pos + _RUN_ID_BYTES > len(_run_id_pool):
+            _run_id_pool = os.urandom(_RUN_ID_POOL_SIZE)
+            _run_id_pos = 0
+        start = _run_id_pos
+        _run_id_pos = start + _RUN_ID_BYTES
+        chunk = _run_id_pool[start:_run_id_pos]
+    return chunk.hex()
+
+
+class _LazyTraceback:
+    """延迟格式化的异常堆栈，仅在 ``str()`` 时展开。"""
+
+    __slots__ = ("exc",)
+
+    def __init__(self, exc: BaseException) -> None:
+        self.exc = exc
+
+    def __str__(self) -> str:
+        exc = self.exc
+        return "".join(traceback.format_exception(type(exc), exc, exc.__traceback__))
+
+
+def _submit_artifact_write(tracker: Any, write: Callable[[], Any], event_type: str) -> None:
+    """优先交给 tracker 的后台队列写入，不支持时退回同步写入。"""
+    submit = getattr(tracker, "submit_artifact_write", None)
+    if callable(submit):
+        submit(write, event_type=event_type)
+        return
+    ref = write()
+    record = getattr(tracker, "record_artifact", None)
+    if callable(record):
+        record(ref, event_type=event_type)
+
+
+def _artifact_flags(settings: Any) -> tuple[bool, bool]:
+    """返回 (save_llm_output, save_parse_failures)；每次直接读取，运行中修改开关立即生效。"""
+    enabled = bool(settings) and bool(getattr(settings, "enabled", False))
+    save_llm_output = enabled and bool(getattr(settings, "save_llm_output", False))
+    save_parse_failures = (
+        enabled
+        and bool(getattr(settings, "debug_enabled", False))
+        and bool(getattr(settings, "save_parse_failures", False))
+    )
+    return save_llm_output, save_parse_failures
+
+
+def _resolve_and_normalize(
+    identifier: str,
+    overrides: dict[str, Any],
+    profile_source: Any,
+) -> tuple[Any, Any, list[Any], Any, list[Any], Optional[Callable[[str], Any]], Any]:
+    resolved_profile = resolve_profile(
+        identifier,
+        overrides,
+        profile_data=profile_source,
+    )
+    if resolved_profile.id is None:
+        resolved_profile.id = identifier
+    policies = normalize_policies(resolved_profile.policies)
+    tool_specs = normalize_tools(list(resolved_profile.tools or []), policies.on_tool_name_conflict)
+    model_spec = normalize_model(resolved_profile.model)
+    tools = runtime_tools(tool_specs)
+    # 输出 schema：模型支持结构化输出时交给 Agent.output_type，否则走字符串解析器
+    output_parser = None
+    output_type = None
+    output_schema = resolved_profile.output_schema
+    if output_schema:
+        if not model_supports_json_and_tool_calls(model_spec):
+            output_parser = _type_parser(output_schema)
+        else:
+            output_type = output_schema
+    return resolved_profile, policies, tool_specs, model_spec, tools, output_parser, output_type
+
+
+@lru_cache(maxsize=256)
+def _cached_type_parser(output_schema: Any) -> Callable[[str], Any]:
+    """解析器只依赖 schema 类本身，按 schema 缓存可安全共享。"""
+    return create_type_parser(output_schema)
+
+
+def _type_parser(output_schema: Any) -> Callable[[str], Any]:
+    try:
+        return _cached_type_parser(output_schema)
+    except TypeError:
+        # 不可哈希的 schema 每次现建
+        return create_type_parser(output_schema)
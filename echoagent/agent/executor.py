@@ -1,6 +1,7 @@
 """Core agent execution primitives."""
 
 import traceback
+from functools import cache, lru_cache
 from typing import Any, Optional
 
 from agents import RunConfig, Runner
@@ -30,6 +31,19 @@ class Executor:
         return await Runner.run(agent, instructions, context=context, run_config=run_config)
 
 
+@cache
+def _echo_agent_type() -> type:
+    # agent.py 经 runner 依赖本模块，只能延迟导入；首次导入后缓存类型
+    from echoagent.agent.agent import EchoAgent
+
+    return EchoAgent
+
+
+# 可在并发的 agent_step 间共享；OutputHandler 仅持有加锁的解析缓存（frozen schema 实例）
+_OUTPUT_HANDLER = OutputHandler()
+_EXECUTOR = Executor()
+
+
 async def agent_step(
     tracker: RuntimeTracker,
     agent,
@@ -61,9 +75,18 @@ async def agent_step(
     Returns:
         Parsed output if output_model provided, otherwise Runner result
     """
+    if not getattr(tracker, "observing", True):
+        return await _run_unobserved(
+            tracker,
+            agent,
+            instructions,
+            output_model=output_model,
+            sync=sync,
+        )
+
     span_factory = agent_span if span_type == "agent" else function_span
-    output_handler = OutputHandler()
-    executor = Executor()
+    output_handler = _OUTPUT_HANDLER
+    executor = _EXECUTOR
 
     handle = tracker.start_agent_step(
         agent=agent,
@@ -82,10 +105,7 @@ async def agent_step(
         with tracker.span_scope(handle) as span:
             # Activate context so tools can access it
             with tracker.activate():
-                run_config = RunConfig(
-                    tracing_disabled=not tracker.enable_tracing,
-                    trace_include_sensitive_data=tracker.trace_sensitive,
-                )
+                run_config = _run_config(not tracker.enable_tracing, tracker.trace_sensitive)
                 result = await executor.run(
                     agent,
                     instructions,
@@ -98,8 +118,7 @@ async def agent_step(
                 #     import ipdb; ipdb.set_trace()
 
                 # Handle EchoAgent parse_output (for legacy string parsers)
-                from echoagent.agent.agent import EchoAgent
-                if isinstance(agent, EchoAgent):
+                if isinstance(agent, _echo_agent_type()) and agent._needs_parse_output:
                     result = await agent.parse_output(result)
 
             raw_output = extract_final_output(result)
@@ -141,6 +160,50 @@ async def agent_step(
         )
 
 
+@lru_cache(maxsize=8)
+def _run_config(disabled: bool, sensitive: bool) -> RunConfig:
+    """按 tracing 开关缓存 RunConfig；Runner 只读取该配置。"""
+    return RunConfig(tracing_disabled=disabled, trace_include_sensitive_data=sensitive)
+
+
+_NOOP_RUN_CONFIG = _run_config(True, False)
+
+
+async def _run_unobserved(
+    tracker: RuntimeTracker,
+    agent: Any,
+    instructions: str,
+    *,
+    output_model: Optional[type[BaseModel]],
+    sync: bool,
+) -> Any:
+    """无任何观测输出时的精简路径：不创建 span、handle 与 printer 状态。"""
+    with tracker.activate():
+        result = await _EXECUTOR.run(
+            agent,
+            instructions,
+            context=tracker.data_store,
+            sync=sync,
+            run_config=_NOOP_RUN_CONFIG,
+        )
+
+        if isinstance(agent, _echo_agent_type()) and agent._needs_parse_output:
+            result = await agent.parse_output(result)
+
+    if not output_model:
+        return result
+    output_handler = _OUTPUT_HANDLER
+    raw_output = extract_final_output(result)
+    try:
+        parsed = output_handler.parse(raw_output, schema=output_model, mode="strict")
+    except Exception as exc:  # noqa: BLE001 - re-raise after observability
+        schema_name = output_handler._schema_name(output_model)
+        error_detail = output_handler._build_error_detail(raw_output, schema_name, exc)
+        _save_parse_failure_snapshot(tracker, raw_output, error_detail, exc, agent=agent)
+        raise
+    return parsed.value
+
+
 def _save_parse_failure_snapshot(
     tracker: RuntimeTracker,
     raw_output: Any,
@@ -169,9 +232,6 @@ def _save_parse_failure_snapshot(
             error_payload = to_dict()
         else:
             error_payload = {"message": str(error_detail)}
-    traceback_text = "".join(
-        traceback.format_exception(type(exception), exception, exception.__traceback__)
-    )
     schema_name = getattr(error_detail, "schema_name", None) if error_detail else None
     error_type = None
     error_message = None
@@ -184,20 +244,33 @@ def _save_parse_failure_snapshot(
         error_message = str(exception)
     run_id = getattr(tracker, "run_id", None) or getattr(tracker, "experiment_id", None) or ""
     profile_name = getattr(agent, "_identifier", None)
-    ref = record_parse_failure(
-        raw_output,
-        store=store,
-        run_id=run_id,
-        agent_name=getattr(agent, "name", ""),
-        profile_name=profile_name,
-        schema_name=schema_name,
-        error_type=error_type,
-        error_message=error_message,
-        traceback_text=traceback_text,
-        handler_name="OutputHandler",
-        error_detail=error_payload,
-        path_prefix="debug",
-    )
+    agent_name = getattr(agent, "name", "")
+
+    def _write() -> Any:
+        # traceback 格式化与落盘都放在写入任务里，不占用 agent_step 的返回路径
+        traceback_text = "".join(
+            traceback.format_exception(type(exception), exception, exception.__traceback__)
+        )
+        return record_parse_failure(
+            raw_output,
+            store=store,
+            run_id=run_id,
+            agent_name=agent_name,
+            profile_name=profile_name,
+            schema_name=schema_name,
+            error_type=error_type,
+            error_message=error_message,
+            traceback_text=traceback_text,
+            handler_name="OutputHandler",
+            error_detail=error_payload,
+            path_prefix="debug",
+        )
+
+    submit = getattr(tracker, "submit_artifact_write", None)
+    if callable(submit):
+        submit(_write, event_type="parse_failure")
+        return
+    ref = _write()
     record = getattr(tracker, "record_artifact", None)
     if callable(record):
         record(ref, event_type="parse_failure")
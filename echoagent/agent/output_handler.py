@@ -1,11 +1,20 @@
 from __future__ import annotations
 
+import asyncio
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
+from hashlib import blake2b
 from typing import Any, Optional
 
 from pydantic import BaseModel
 
-from echoagent.utils.helpers import parse_to_model, serialize_content
+from echoagent.utils.helpers import is_deeply_frozen_model, parse_to_model, serialize_content
+
+
+# 解析结果缓存：仅深度不可变 schema 的字符串输出，按文本摘要作键、LRU 淘汰
+_PARSE_CACHE_SIZE = 256
+_PARSE_CACHE_MAX_CHARS = 64_000
 
 
 @dataclass
@@ -37,6 +46,10 @@ class ParsedOutput:
 class OutputHandler:
     """将模型原始输出解析为结构化结果。"""
 
+    def __init__(self) -> None:
+        self._parse_cache: OrderedDict[tuple[type[BaseModel], bytes], BaseModel] = OrderedDict()
+        self._parse_cache_lock = threading.Lock()
+
     @staticmethod
     def _schema_name(schema: Optional[Any]) -> Optional[str]:
         if schema is None:
@@ -52,7 +65,7 @@ class OutputHandler:
 
         try:
             if isinstance(schema, type) and issubclass(schema, BaseModel):
-                value = parse_to_model(raw_output, schema)
+                value = self._parse_model_cached(raw_output, schema)
             elif callable(schema):
                 value = schema(raw_output)
             else:
@@ -71,6 +84,51 @@ class OutputHandler:
                 error_detail=error_detail,
             )
 
+    async def parse_many(
+        self,
+        raws: list[Any],
+        *,
+        schema: Optional[Any] = None,
+        mode: str = "lenient",
+        chunk_size: int = 8,
+    ) -> list[ParsedOutput]:
+        """批量解析；pydantic schema 按 chunk_size 分批放到线程中执行，结果保持输入顺序。"""
+        if not (isinstance(schema, type) and issubclass(schema, BaseModel)):
+            return [self.parse(raw, schema=schema, mode=mode) for raw in raws]
+        size = max(1, chunk_size)
+        results: list[ParsedOutput] = []
+        for start in range(0, len(raws), size):
+            batch = raws[start:start + size]
+            results.extend(
+                await asyncio.gather(
+                    *[asyncio.to_thread(self.parse, raw, schema=schema, mode=mode) for raw in batch]
+                )
+            )
+        return results
+
+    def _parse_model_cached(self, raw_output: Any, schema: type[BaseModel]) -> Any:
+        """字段全为不可变类型的 frozen schema，相同 (schema, 原始文本摘要) 直接复用已校验实例。"""
+        if (
+            type(raw_output) is not str
+            or len(raw_output) > _PARSE_CACHE_MAX_CHARS
+            or not is_deeply_frozen_model(schema)
+        ):
+            # 含可变字段（包括 frozen 模型里的嵌套 list/dict）时复用需深拷贝，代价高于重新校验
+            return parse_to_model(raw_output, schema)
+        key = (schema, blake2b(raw_output.encode("utf-8"), digest_size=16).digest())
+        with self._parse_cache_lock:
+            cached = self._parse_cache.get(key)
+            if cached is not None:
+                self._parse_cache.move_to_end(key)
+                return cached
+        value = parse_to_model(raw_output, schema)
+        if isinstance(value, schema):
+            with self._parse_cache_lock:
+                self._parse_cache[key] = value
+                if len(self._parse_cache) > _PARSE_CACHE_SIZE:
+                    self._parse_cache.popitem(last=False)
+        return value
+
     @staticmethod
     def _build_error_detail(raw_output: Any, schema_name: Optional[str], exc: Exception) -> ParseErrorInfo:
         return ParseErrorInfo(
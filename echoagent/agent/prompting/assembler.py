@@ -1,13 +1,46 @@
 from __future__ import annotations
 
 import re
+from functools import lru_cache
 from typing import Any, Optional
 
 from pydantic import BaseModel
 
 from echoagent.agent.prompting.blocks import ContextBlock
 from echoagent.agent.prompting.history_renderer import render_iteration_history
-from echoagent.context.policy import apply_block_policy, normalize_context_policy
+from echoagent.context.policy import ContextPolicy, apply_block_policy, normalize_context_policy
+
+_FALLBACK_BLOCK_NAMES = (
+    "ORIGINAL_QUERY",
+    "ACTIVE_SKILL",
+    "SKILL_INDEX",
+    "MESSAGE_HISTORY",
+    "PREVIOUS_ITERATIONS",
+    "TOOL_RESULTS",
+    "CURRENT_INPUT",
+)
+# 区块标题前缀
+_H_ORIGINAL_QUERY = "[ORIGINAL QUERY]\n"
+_H_SKILL_INDEX = "[SKILL INDEX]\n"
+_H_ACTIVE_SKILL = "[ACTIVE SKILL]\n"
+_H_MESSAGE_HISTORY = "[MESSAGE HISTORY]\n"
+_H_PREVIOUS_ITERATIONS = "[PREVIOUS ITERATIONS]\n"
+_H_TOOL_RESULTS = "[TOOL RESULTS]\n"
+_H_CURRENT_INPUT = "[CURRENT INPUT]\n"
+_PLACEHOLDER_RE = re.compile(r"\{([a-z_]+)\}")
+
+
+@lru_cache(maxsize=256)
+def _template_placeholders(template: str) -> frozenset[str]:
+    """解析模板占位符；同一模板字符串在多次 assemble 间复用结果。"""
+    return frozenset(_PLACEHOLDER_RE.findall(template))
+
+
+def _get_field(event: Any, name: str) -> Any:
+    """事件可能是 dict 或对象，统一按字段名读取。"""
+    if isinstance(event, dict):
+        return event.get(name)
+    return getattr(event, name, None)
 
 
 class ContextAssembler:
@@ -20,8 +53,11 @@ class ContextAssembler:
         *,
         payload: Any = None,
         payload_str: Optional[str] = None,
+        policy: Optional[ContextPolicy] = None,
     ) -> list[ContextBlock]:
-        policy = normalize_context_policy(getattr(profile, "context_policy", None))
+        # 调用方可传入按 profile 预先规范化的策略
+        if policy is None:
+            policy = normalize_context_policy(getattr(profile, "context_policy", None))
         if profile and hasattr(profile, "runtime_template") and profile.runtime_template:
             block = self._build_runtime_template_block(state, profile, payload, payload_str, policy)
             if block is not None:
@@ -40,7 +76,15 @@ class ContextAssembler:
         if block_policy is None:
             return None
         template = profile.runtime_template
-        placeholders = set(re.findall(r"\{([a-z_]+)\}", template))
+        placeholders = _template_placeholders(template)
+        if not placeholders and "{" not in template and "}" not in template:
+            # 无任何占位符或转义花括号时 format 不会改变文本，直接复用模板
+            return ContextBlock(
+                name="RUNTIME_TEMPLATE",
+                content=template,
+                priority=100,
+                max_chars=block_policy.max_chars,
+            )
 
         context_dict: dict[str, str] = {}
 
@@ -85,92 +129,102 @@ class ContextAssembler:
         payload_str: Optional[str],
         policy: Any,
     ) -> list[ContextBlock]:
+        # 区块按优先级降序追加，渲染时无需再排序
         blocks: list[ContextBlock] = []
+        block_policies = {name: apply_block_policy(name, policy) for name in _FALLBACK_BLOCK_NAMES}
 
         query = getattr(state, "query", None)
-        block_policy = apply_block_policy("ORIGINAL_QUERY", policy)
+        block_policy = block_policies["ORIGINAL_QUERY"]
         if query and block_policy is not None:
             blocks.append(
                 ContextBlock(
                     name="ORIGINAL_QUERY",
-                    content=f"[ORIGINAL QUERY]\n{query}",
+                    content=_H_ORIGINAL_QUERY + str(query),
                     priority=100,
                     max_chars=block_policy.max_chars,
                 )
             )
 
-        skill_index = getattr(state, "available_skills_text", "") or getattr(state, "skills_index_text", "")
-        block_policy = apply_block_policy("SKILL_INDEX", policy)
-        if skill_index and block_policy is not None:
+        active_skill = getattr(state, "active_skill_text", "") or getattr(state, "active_skill_markdown", "")
+        block_policy = block_policies["ACTIVE_SKILL"]
+        if active_skill and block_policy is not None:
             blocks.append(
                 ContextBlock(
-                    name="SKILL_INDEX",
-                    content=f"[SKILL INDEX]\n{skill_index}",
-                    priority=97,
+                    name="ACTIVE_SKILL",
+                    content=_H_ACTIVE_SKILL + str(active_skill),
+                    priority=98,
                     max_chars=block_policy.max_chars,
                 )
             )
 
-        active_skill = getattr(state, "active_skill_text", "") or getattr(state, "active_skill_markdown", "")
-        block_policy = apply_block_policy("ACTIVE_SKILL", policy)
-        if active_skill and block_policy is not None:
+        skill_index = getattr(state, "available_skills_text", "") or getattr(state, "skills_index_text", "")
+        block_policy = block_policies["SKILL_INDEX"]
+        if skill_index and block_policy is not None:
             blocks.append(
                 ContextBlock(
-                    name="ACTIVE_SKILL",
-                    content=f"[ACTIVE SKILL]\n{active_skill}",
-                    priority=98,
+                    name="SKILL_INDEX",
+                    content=_H_SKILL_INDEX + str(skill_index),
+                    priority=97,
                     max_chars=block_policy.max_chars,
                 )
             )
 
-        event_history = self._render_message_history(getattr(state, "events", []) or [])
-        block_policy = apply_block_policy("MESSAGE_HISTORY", policy)
+        # 先取区块策略，被禁用的区块不再渲染其内容
+        history_policy = block_policies["MESSAGE_HISTORY"]
+        tool_results_policy = block_policies["TOOL_RESULTS"]
+        event_history = tool_results = ""
+        if history_policy is not None or tool_results_policy is not None:
+            events = getattr(state, "events", None) or []
+            if events:
+                event_history, tool_results = self._render_events(events)
+        block_policy = history_policy
         if event_history and block_policy is not None:
             blocks.append(
                 ContextBlock(
                     name="MESSAGE_HISTORY",
-                    content=f"[MESSAGE HISTORY]\n{event_history}",
+                    content=_H_MESSAGE_HISTORY + event_history,
                     priority=95,
                     max_chars=block_policy.max_chars,
                 )
             )
 
-        iterations = getattr(state, "iterations", []) or []
-        current_iteration = iterations[-1] if iterations else None
-        history = render_iteration_history(
-            iterations,
-            include_current=False,
-            current_iteration=current_iteration,
-        )
-        block_policy = apply_block_policy("PREVIOUS_ITERATIONS", policy)
+        block_policy = block_policies["PREVIOUS_ITERATIONS"]
+        history = ""
+        if block_policy is not None:
+            iterations = getattr(state, "iterations", None) or []
+            if iterations:
+                history = render_iteration_history(
+                    iterations,
+                    include_current=False,
+                    current_iteration=iterations[-1],
+                )
         if history and block_policy is not None:
             blocks.append(
                 ContextBlock(
                     name="PREVIOUS_ITERATIONS",
-                    content=f"[PREVIOUS ITERATIONS]\n{history}",
+                    content=_H_PREVIOUS_ITERATIONS + history,
                     priority=90,
                     max_chars=block_policy.max_chars,
                 )
             )
 
-        tool_results = self._render_tool_results(getattr(state, "events", []) or [])
-        block_policy = apply_block_policy("TOOL_RESULTS", policy)
+        block_policy = tool_results_policy
         if tool_results and block_policy is not None:
             blocks.append(
                 ContextBlock(
                     name="TOOL_RESULTS",
-                    content=f"[TOOL RESULTS]\n{tool_results}",
+                    content=_H_TOOL_RESULTS + tool_results,
                     priority=85,
                     max_chars=block_policy.max_chars,
                 )
             )
 
-        block_policy = apply_block_policy("CURRENT_INPUT", policy)
+        block_policy = block_policies["CURRENT_INPUT"]
         if payload_str and block_policy is not None:
             blocks.append(
                 ContextBlock(
                     name="CURRENT_INPUT",
-                    content=f"[CURRENT INPUT]\n{payload_str}",
+                    content=_H_CURRENT_INPUT + payload_str,
                     priority=80,
                     max_chars=block_policy.max_chars,
                 )
@@ -178,51 +232,35 @@ class ContextAssembler:
 
         return blocks
 
-    def _render_message_history(self, events: list[Any]) -> str:
-        lines: list[str] = []
+    def _render_events(self, events: list[Any]) -> tuple[str, str]:
+        """单次遍历事件，同时产出消息历史与各工具的最新结果。"""
+        message_lines: list[str] = []
+        # tool_name -> (event, meta)；pop 后重新插入，保证按最近一次结果的顺序输出
+        latest: dict[str, tuple[Any, dict[str, Any]]] = {}
         for event in events:
-            event_type = getattr(event, "type", None) or getattr(event, "get", lambda *_: None)("type")
-            if event_type not in {"USER_MESSAGE", "ASSISTANT_MESSAGE"}:
-                continue
-            content = getattr(event, "content", None)
-            if content is None and isinstance(event, dict):
-                content = event.get("content")
-            if not content:
-                continue
-            label = "USER" if event_type == "USER_MESSAGE" else "ASSISTANT"
-            lines.append(f"[{label}]\n{content}")
-        return "\n\n".join(lines).strip()
-
-    def _render_tool_results(self, events: list[Any]) -> str:
-        latest: dict[str, Any] = {}
-        for event in events:
-            event_type = getattr(event, "type", None) or getattr(event, "get", lambda *_: None)("type")
-            if event_type != "TOOL_RESULT":
-                continue
-            meta = getattr(event, "meta", None)
-            if meta is None and isinstance(event, dict):
-                meta = event.get("meta")
-            if not isinstance(meta, dict):
-                meta = {}
-            tool_name = meta.get("tool_name") or meta.get("name") or "tool"
-            if tool_name in latest:
+            event_type = _get_field(event, "type")
+            if event_type == "USER_MESSAGE" or event_type == "ASSISTANT_MESSAGE":
+                content = _get_field(event, "content")
+                if not content:
+                    continue
+                label = "USER" if event_type == "USER_MESSAGE" else "ASSISTANT"
+                message_lines.append(f"[{label}]\n{content}")
+            elif event_type == "TOOL_RESULT":
+                meta = _get_field(event, "meta")
+                if not isinstance(meta, dict):
+                    meta = {}
+                tool_name = meta.get("tool_name") or meta.get("name") or "tool"
                 latest.pop(tool_name, None)
-            latest[tool_name] = event
+                latest[tool_name] = (event, meta)
 
-        lines: list[str] = []
-        for tool_name, event in latest.items():
-            content = getattr(event, "content", None)
-            if content is None and isinstance(event, dict):
-                content = event.get("content")
+        tool_lines: list[str] = []
+        for tool_name, (event, meta) in latest.items():
+            content = _get_field(event, "content")
             if not content:
                 continue
-            lines.append(f"[TOOL {tool_name}]\n{content}")
-            meta = getattr(event, "meta", None)
-            if meta is None and isinstance(event, dict):
-                meta = event.get("meta")
-            if isinstance(meta, dict):
-                refs = meta.get("sources") or meta.get("artifacts")
-                if refs:
-                    lines.append(f"<refs>\n{refs}\n</refs>")
-
-        return "\n\n".join(lines).strip()
+            tool_lines.append(f"[TOOL {tool_name}]\n{content}")
+            refs = meta.get("sources") or meta.get("artifacts")
+            if refs:
+                tool_lines.append(f"<refs>\n{refs}\n</refs>")
+
+        return "\n\n".join(message_lines).strip(), "\n\n".join(tool_lines).strip()
@@ -15,17 +15,26 @@ class CharBudgetPolicy:
     """按字符预算裁剪上下文区块。"""
 
     def trim(self, blocks: Iterable[ContextBlock], max_chars: Optional[int]) -> list[ContextBlock]:
-        block_list = list(blocks)
         if max_chars is None:
-            return list(block_list)
+            return list(blocks)
         if max_chars <= 0:
             return []
 
-        trimmed = [self._apply_block_limit(block) for block in block_list]
-        total = sum(len(block.content) for block in trimmed)
+        # 单区块上限与总长统计合并为一遍
+        trimmed: list[ContextBlock] = []
+        total = 0
+        for block in blocks:
+            block = self._apply_block_limit(block)
+            trimmed.append(block)
+            total += len(block.content)
         if total <= max_chars:
             return self._drop_empty(trimmed)
 
+        # 同名区块只裁剪第一个，与逐个扫描的语义一致
+        name_to_idx: dict[str, int] = {}
+        for idx, block in enumerate(trimmed):
+            name_to_idx.setdefault(block.name, idx)
+
         for name in (
             "PREVIOUS_ITERATIONS",
             "MESSAGE_HISTORY",
@@ -34,19 +43,19 @@ class CharBudgetPolicy:
         ):
             if total <= max_chars:
                 break
-            for idx, block in enumerate(trimmed):
-                if block.name != name:
-                    continue
-                total, trimmed[idx] = self._trim_block_to_fit(block, total, max_chars)
-                break
+            idx = name_to_idx.get(name)
+            if idx is None:
+                continue
+            total, trimmed[idx] = self._trim_block_to_fit(trimmed[idx], total, max_chars)
 
         return self._drop_empty(trimmed)
 
     def _apply_block_limit(self, block: ContextBlock) -> ContextBlock:
+        # 区块在 trim 流程中只读，无需裁剪时直接返回原对象
         if block.max_chars is None:
-            return replace(block)
+            return block
         if len(block.content) <= block.max_chars:
-            return replace(block)
+            return block
         keep_tail = block.name in (
             "PREVIOUS_ITERATIONS",
             "MESSAGE_HISTORY",
@@ -59,7 +68,7 @@ class CharBudgetPolicy:
     def _trim_block_to_fit(self, block: ContextBlock, total: int, max_chars: int) -> tuple[int, ContextBlock]:
         excess = total - max_chars
         if excess <= 0:
-            return total, replace(block)
+            return total, block
 
         current_len = len(block.content)
         allowed = current_len - excess
@@ -82,23 +91,23 @@ class CharBudgetPolicy:
         if len(content) <= limit:
             return content
 
-        if "\n" not in content:
+        # find 定位首行边界，直接切片，避免 split 产生列表与中间字符串
+        header_len = content.find("\n")
+        if header_len < 0:
             return content[-limit:] if keep_tail else content[:limit]
-
-        header, body = content.split("\n", 1)
-        header_len = len(header)
         if header_len >= limit:
-            return header[:limit]
+            return content[:limit]
 
         remaining = limit - header_len - 1
         if remaining <= 0:
-            return header[:limit]
+            return content[:header_len]
 
-        body_slice = body[-remaining:] if keep_tail else body[:remaining]
-        return f"{header}\n{body_slice}"
+        if keep_tail:
+            return content[: header_len + 1] + content[-remaining:]
+        return content[: header_len + 1 + remaining]
 
     def _drop_empty(self, blocks: list[ContextBlock]) -> list[ContextBlock]:
-        return [block for block in blocks if block.content and block.content.strip()]
+        return [block for block in blocks if block.content and not block.content.isspace()]
 
 
 class ContextBudgeter:
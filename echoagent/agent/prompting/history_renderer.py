@@ -14,44 +14,62 @@ def _render_payload(payload: Any) -> str:
 
 
 def render_iteration_block(iteration: BaseIterationRecord) -> str:
-    lines: list[str] = [f"[ITERATION {iteration.index}]"]
+    parts: list[str] = []
+    _append_iteration_parts(parts, iteration)
+    return "".join(parts).strip()
+
+
+def render_iteration_digest_block(iteration: BaseIterationRecord) -> str:
+    parts: list[str] = []
+    _append_iteration_digest_parts(parts, iteration)
+    return "".join(parts).strip()
+
+
+def _append_iteration_parts(parts: list[str], iteration: BaseIterationRecord) -> None:
+    # 直接写入调用方的 parts 列表，由最外层统一 join 一次
+    parts.append(f"[ITERATION {iteration.index}]")
 
     if iteration.observation:
-        lines.append(f"<thought>\n{iteration.observation}\n</thought>")
+        parts.append("\n\n<thought>\n")
+        parts.append(str(iteration.observation))
+        parts.append("\n</thought>")
 
     if iteration.payloads:
-        payload_lines = [_render_payload(payload) for payload in iteration.payloads]
-        if payload_lines:
-            lines.append(f"<payloads>\n{chr(10).join(payload_lines)}\n</payloads>")
+        parts.append("\n\n<payloads>")
+        for payload in iteration.payloads:
+            parts.append("\n")
+            parts.append(_render_payload(payload))
+        parts.append("\n</payloads>")
 
     if iteration.tools:
-        tool_lines = [tool.output for tool in iteration.tools]
-        lines.append(f"<findings>\n{chr(10).join(tool_lines)}\n</findings>")
-
-    return "\n\n".join(lines).strip()
+        parts.append("\n\n<findings>")
+        for tool in iteration.tools:
+            parts.append("\n")
+            parts.append(tool.output)
+        parts.append("\n</findings>")
 
 
-def render_iteration_digest_block(iteration: BaseIterationRecord) -> str:
+def _append_iteration_digest_parts(parts: list[str], iteration: BaseIterationRecord) -> None:
     digest = iteration.digest
     if digest is None:
-        return render_iteration_block(iteration)
+        _append_iteration_parts(parts, iteration)
+        return
 
-    lines: list[str] = [f"[ITERATION {iteration.index}]", "<digest>"]
-    lines.append(f"summary: {digest.summary}")
-    lines.extend(_render_digest_list("facts", digest.facts))
-    lines.extend(_render_digest_list("decisions", digest.decisions))
-    lines.extend(_render_digest_list("open_questions", digest.open_questions))
-    lines.extend(_render_digest_list("action_items", digest.action_items))
-    lines.append("</digest>")
-    return "\n".join(lines).strip()
+    parts.append(f"[ITERATION {iteration.index}]\n<digest>\nsummary: {digest.summary}")
+    _append_digest_list(parts, "facts", digest.facts)
+    _append_digest_list(parts, "decisions", digest.decisions)
+    _append_digest_list(parts, "open_questions", digest.open_questions)
+    _append_digest_list(parts, "action_items", digest.action_items)
+    parts.append("\n</digest>")
 
 
-def _render_digest_list(label: str, items: list[str]) -> list[str]:
+def _append_digest_list(parts: list[str], label: str, items: list[str]) -> None:
     if not items:
-        return [f"{label}: []"]
-    lines = [f"{label}:"]
-    lines.extend(f"- {item}" for item in items)
-    return lines
+        parts.append(f"\n{label}: []")
+        return
+    parts.append(f"\n{label}:")
+    for item in items:
+        parts.append(f"\n- {item}")
 
 
 def render_iteration_history(
@@ -62,29 +80,34 @@ def render_iteration_history(
     current_iteration: Optional[BaseIterationRecord] = None,
     raw_keep_last: int = 2,
 ) -> str:
-    blocks: list[str] = []
-    candidates: list[tuple[BaseIterationRecord, bool]] = []
+    # 并行列表（SoA）：避免为每个候选迭代分配 tuple，is_complete() 也只调用一次
+    cand_records: list[BaseIterationRecord] = []
+    cand_is_current: list[bool] = []
+    cand_complete: list[bool] = []
     for iteration in iterations:
         is_current = current_iteration is not None and iteration is current_iteration
-        if iteration.is_complete() or (include_current and is_current):
+        is_complete = iteration.is_complete()
+        if is_complete or (include_current and is_current):
             if only_unsummarized and iteration.summarized:
                 continue
-            candidates.append((iteration, is_current))
+            cand_records.append(iteration)
+            cand_is_current.append(is_current)
+            cand_complete.append(is_complete)
 
-    completed = [item for item, _ in candidates if item.is_complete()]
+    completed = [record for record, done in zip(cand_records, cand_complete) if done]
     raw_tail = completed[-raw_keep_last:] if raw_keep_last > 0 else []
     raw_ids = {id(item) for item in raw_tail}
 
-    for iteration, is_current in candidates:
-        if is_current and not iteration.is_complete():
-            block = render_iteration_block(iteration)
-        elif id(iteration) in raw_ids:
-            block = render_iteration_block(iteration)
+    # 所有迭代写入同一个 token 列表，只在最外层 join 一次
+    out: list[str] = []
+    for idx, iteration in enumerate(cand_records):
+        if out:
+            out.append("\n\n")
+        if (cand_is_current[idx] and not cand_complete[idx]) or id(iteration) in raw_ids:
+            _append_iteration_parts(out, iteration)
         else:
-            block = render_iteration_digest_block(iteration)
-        if block:
-            blocks.append(block)
-    return "\n\n".join(blocks).strip()
+            _append_iteration_digest_parts(out, iteration)
+    return "".join(out).strip()
 
 
 def render_context_prompt(state: Any, *, current_input: Optional[str] = None) -> str:
@@ -1,14 +1,159 @@
 from __future__ import annotations
 
 import json
-from typing import Any, Mapping, Optional
-
-from pydantic import BaseModel
+import os
+import weakref
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Optional
 
 from echoagent.agent.prompting.assembler import ContextAssembler
 from echoagent.agent.prompting.budget import ContextBudgeter
 from echoagent.agent.prompting.renderer import PromptRenderer
-from echoagent.context.policy import normalize_context_policy
+from echoagent.context.policy import ContextPolicy, apply_block_policy, normalize_context_policy
+from echoagent.utils.helpers import is_deeply_frozen_model
+
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖，缺失时回退到标准库 json
+    orjson = None
+
+# datetime / dataclass 交给回退路径处理，使输出与是否安装 orjson 无关（标准库同样拒绝这些类型）
+_ORJSON_OPTIONS = (
+    orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS if orjson is not None else 0
+)
+
+ENV_PRETTY_PAYLOAD = "ECHOAGENT_PRETTY_PAYLOAD"
+# 默认输出紧凑 JSON；调试时可通过环境变量开启缩进
+_PRETTY_PAYLOAD = os.getenv(ENV_PRETTY_PAYLOAD, "").strip().lower() in {"1", "true", "yes", "on"}
+
+# 三者都不持有调用间状态，可在所有 InstructionBuilder 间共享
+_ASSEMBLER = ContextAssembler()
+_BUDGETER = ContextBudgeter()
+_RENDERER = PromptRenderer()
+
+
+@dataclass(frozen=True, slots=True)
+class _BuildPlan:
+    """按 profile 预先解析的构建参数；profile 加载后视为只读。"""
+
+    context_policy: ContextPolicy
+    context_budget: Optional[int]
+    # 模板不依赖状态与 payload 时的最终文本，build 可直接返回
+    static_text: Optional[str] = None
+
+
+# id(profile) -> (弱引用, 构建计划)；profile 回收时自动移除
+_PLAN_CACHE: dict[int, tuple[weakref.ref, _BuildPlan]] = {}
+
+
+def _compute_context_budget(profile: Any, policy: ContextPolicy) -> Optional[int]:
+    context_budget = policy.total_budget
+    if context_budget or not hasattr(profile, "policies"):
+        return context_budget
+    policies = profile.policies
+    # dict 走 get，RunPolicies 等对象走属性；鸭子类型判定避免 Mapping 的 ABC 检查
+    getter = getattr(policies, "get", None)
+    if getter is not None:
+        return getter("context_budget")
+    return getattr(policies, "context_budget", None)
+
+
+def _compute_static_text(profile: Any, policy: ContextPolicy, context_budget: Optional[int]) -> Optional[str]:
+    template = getattr(profile, "runtime_template", None)
+    if not template or not template.strip() or "{" in template or "}" in template:
+        return None
+    block_policy = apply_block_policy("RUNTIME_TEMPLATE", policy)
+    if block_policy is None or block_policy.max_chars is not None:
+        return None
+    if context_budget is not None and (context_budget <= 0 or context_budget < len(template)):
+        return None
+    return template
+
+
+def _build_plan(profile: Any) -> _BuildPlan:
+    """同一 profile 对象只解析一次；不可弱引用的对象每次现算。"""
+    key = id(profile)
+    cached = _PLAN_CACHE.get(key)
+    if cached is not None and cached[0]() is profile:
+        return cached[1]
+    policy = normalize_context_policy(getattr(profile, "context_policy", None))
+    context_budget = _compute_context_budget(profile, policy)
+    plan = _BuildPlan(
+        context_policy=policy,
+        context_budget=context_budget,
+        static_text=_compute_static_text(profile, policy, context_budget),
+    )
+    try:
+        ref = weakref.ref(profile, lambda _ref, key=key: _PLAN_CACHE.pop(key, None))
+    except TypeError:
+        return plan
+    _PLAN_CACHE[key] = (ref, plan)
+    return plan
+
+
+# id(payload) -> (弱引用, 序列化结果)；仅缓存深度不可变的模型，可变对象无法安全复用
+_PAYLOAD_CACHE: dict[int, tuple[weakref.ref, str]] = {}
+
+
+def _dump_model(payload: Any) -> str:
+    if _PRETTY_PAYLOAD:
+        return payload.model_dump_json(indent=2)
+    return payload.model_dump_json()
+
+
+def _dump_model_cached(payload: Any) -> str:
+    """深度不可变的 frozen 模型在循环中常被重复传入，按对象缓存其序列化结果。"""
+    # 仅 frozen 不够：嵌套 list/dict 仍可原地修改，缓存会把旧内容送进 prompt
+    if not is_deeply_frozen_model(type(payload)):
+        return _dump_model(payload)
+    key = id(payload)
+    cached = _PAYLOAD_CACHE.get(key)
+    if cached is not None and cached[0]() is payload:
+        return cached[1]
+    text = _dump_model(payload)
+    try:
+        ref = weakref.ref(payload, lambda _ref, key=key: _PAYLOAD_CACHE.pop(key, None))
+    except TypeError:
+        return text
+    _PAYLOAD_CACHE[key] = (ref, text)
+    return text
+
+
+def _dump_str(payload: str) -> str:
+    return payload
+
+
+def _dump_dict(payload: dict) -> str:
+    if orjson is not None:
+        try:
+            if _PRETTY_PAYLOAD:
+                return orjson.dumps(payload, option=_ORJSON_OPTIONS | orjson.OPT_INDENT_2).decode()
+            return orjson.dumps(payload, option=_ORJSON_OPTIONS).decode()
+        except TypeError:
+            # 非字符串键或不支持的值类型，交给标准库处理（含原有报错行为）
+            pass
+    if _PRETTY_PAYLOAD:
+        return json.dumps(payload, indent=2, ensure_ascii=False)
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+
+
+# 按具体类型缓存判定结果，避免每次调用都走 isinstance（BaseModel 的元类检查较重）；
+# 设上限以免动态创建的模型类（如按请求 create_model）被永久持有
+_SERIALIZER_CACHE_SIZE = 256
+
+
+@lru_cache(maxsize=_SERIALIZER_CACHE_SIZE)
+def _resolve_serializer(cls: type) -> Callable[[Any], str]:
+    """按原有顺序判定 payload 类型对应的序列化函数。"""
+    if issubclass(cls, str):
+        return _dump_str
+    # 按 pydantic 模型的接口鸭子类型判定，模块无需导入 pydantic
+    if callable(getattr(cls, "model_dump_json", None)):
+        return _dump_model_cached
+    if issubclass(cls, dict):
+        return _dump_dict
+    return str
 
 
 class InstructionBuilder:
@@ -19,34 +164,56 @@ class InstructionBuilder:
         """将支持的 payload 类型规范化为 LLM 可消费的字符串。"""
         if payload is None:
             return None
-        if isinstance(payload, str):
-            return payload
-        if isinstance(payload, BaseModel):
-            return payload.model_dump_json(indent=2)
-        if isinstance(payload, dict):
-            return json.dumps(payload, indent=2)
-        return str(payload)
-
-    def build(self, state: Any, profile: Any, *, runtime: Optional[dict[str, Any]] = None) -> str:
-        """基于运行时状态自动注入上下文并构建指令。"""
-        payload = runtime.get("payload") if runtime else None
+        return _resolve_serializer(type(payload))(payload)
+
+    def static_instructions(self, profile: Any) -> Optional[str]:
+        """若 profile 的运行期模板不依赖状态与 payload，返回其最终文本，否则返回 None。"""
+        if not profile:
+            return None
+        return _build_plan(profile).static_text
+
+    @staticmethod
+    def _resolve_context_budget(profile: Any) -> Optional[int]:
+        """解析上下文预算。"""
+        if profile is None:
+            return None
+        return _build_plan(profile).context_budget
+
+    def build(
+        self,
+        state: Any,
+        profile: Any,
+        *,
+        payload: Any = None,
+        runtime: Optional[dict[str, Any]] = None,
+    ) -> str:
+        """基于运行时状态自动注入上下文并构建指令。
+
+        payload 直接传入即可；runtime={"payload": ...} 仍兼容旧调用方。
+        """
+        if profile is not None:
+            plan = _build_plan(profile)
+            if plan.static_text is not None:
+                return plan.static_text
+            context_policy = plan.context_policy
+            context_budget = plan.context_budget
+        else:
+            context_policy = None
+            context_budget = None
+        if payload is None and runtime:
+            payload = runtime.get("payload")
         payload_str = self._serialize_payload(payload)
 
-        assembler = ContextAssembler()
-        blocks = assembler.assemble(state, profile, payload=payload, payload_str=payload_str)
-
-        context_budget = None
-        context_policy = normalize_context_policy(getattr(profile, "context_policy", None))
-        if context_policy.total_budget is not None:
-            context_budget = context_policy.total_budget
-        if profile and hasattr(profile, "policies"):
-            policies = profile.policies
-            if isinstance(policies, Mapping):
-                context_budget = context_budget or policies.get("context_budget")
-            else:
-                context_budget = context_budget or getattr(policies, "context_budget", None)
-        budgeter = ContextBudgeter()
-        blocks = budgeter.trim(blocks, context_budget)
-
-        renderer = PromptRenderer()
-        return renderer.render(blocks)
+        blocks = _ASSEMBLER.assemble(
+            state,
+            profile,
+            payload=payload,
+            payload_str=payload_str,
+            policy=context_policy,
+        )
+
+        # 未配置预算时 trim 只会原样返回，直接跳过
+        if context_budget is not None:
+            blocks = _BUDGETER.trim(blocks, context_budget)
+
+        return _RENDERER.render(blocks)
@@ -1,23 +1,36 @@
 from __future__ import annotations
 
-from typing import Iterable
+from functools import lru_cache
+from operator import attrgetter
+from typing import Iterable, Optional
 
 from echoagent.agent.prompting.blocks import ContextBlock
 
+_CONTENT = attrgetter("content")
+
+
+@lru_cache(maxsize=128)
+def _render_order(priorities: tuple[int, ...]) -> Optional[tuple[int, ...]]:
+    """按优先级降序的稳定下标序列；已有序时返回 None。同一区块形状只计算一次。"""
+    order = tuple(sorted(range(len(priorities)), key=priorities.__getitem__, reverse=True))
+    if order == tuple(range(len(priorities))):
+        return None
+    return order
+
 
 class PromptRenderer:
     """按优先级稳定渲染上下文区块。"""
 
     def render(self, blocks: Iterable[ContextBlock]) -> str:
-        block_list = list(blocks)
+        # 上游已传入 list 时直接使用，不再复制
+        block_list = blocks if type(blocks) is list else list(blocks)
         if not block_list:
             return ""
         if len(block_list) == 1 and block_list[0].name == "RUNTIME_TEMPLATE":
             return block_list[0].content
 
-        ordered = sorted(
-            enumerate(block_list),
-            key=lambda item: (-item[1].priority, item[0]),
-        )
-        contents = [block.content for _, block in ordered if block.content and block.content.strip()]
+        order = _render_order(tuple([block.priority for block in block_list]))
+        ordered = block_list if order is None else map(block_list.__getitem__, order)
+        # 排序与取内容在同一遍中完成，不再生成重排后的中间列表
+        contents = [content for content in map(_CONTENT, ordered) if content and not content.isspace()]
         return "\n\n".join(contents).strip()
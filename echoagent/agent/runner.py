@@ -37,14 +37,14 @@ class AgentRunner(Protocol):
 
 class ExecutorRunner(AgentRunner):
     def __init__(self) -> None:
-        self._connected_servers: list[Any] = []
+        self._connected_servers: tuple[Any, ...] = ()
 
     async def open(self, *, runtime_config: Optional[RuntimeConfig] = None) -> None:
         if runtime_config and runtime_config.mcp_servers:
-            self._connected_servers = list(runtime_config.mcp_servers)
+            self._connected_servers = runtime_config.mcp_servers
 
     async def close(self) -> None:
-        self._connected_servers = []
+        self._connected_servers = ()
 
     async def run(
         self,
@@ -1,15 +1,15 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass
 from typing import Any, Mapping, Optional
 
 from echoagent.profiles.base import Profile
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class RuntimeConfig:
-    mcp_server_names: list[str] = field(default_factory=list)
-    mcp_servers: list[Any] = field(default_factory=list)
+    mcp_server_names: tuple[str, ...] = ()
+    mcp_servers: tuple[Any, ...] = ()
 
     @classmethod
     def from_profile_input(
@@ -19,18 +19,27 @@ class RuntimeConfig:
         overrides: Optional[dict[str, Any]] = None,
     ) -> "RuntimeConfig":
         overrides = overrides or {}
-        server_names: list[str] = []
-        servers: list[Any] = []
+        server_names: tuple[str, ...] = ()
+        servers: tuple[Any, ...] = ()
         if "mcp_server_names" in overrides:
-            server_names = list(overrides.get("mcp_server_names") or [])
+            server_names = _as_tuple(overrides.get("mcp_server_names"))
         if "mcp_servers" in overrides:
-            servers = list(overrides.get("mcp_servers") or [])
+            servers = _as_tuple(overrides.get("mcp_servers"))
         if server_names or servers:
             return cls(mcp_server_names=server_names, mcp_servers=servers)
         if isinstance(profile, Profile):
-            return cls(mcp_server_names=list(profile.mcp_server_names or []))
+            return cls(mcp_server_names=_as_tuple(profile.mcp_server_names))
         if isinstance(profile, Mapping):
-            return cls(mcp_server_names=list(profile.get("mcp_server_names") or []))
+            return cls(mcp_server_names=_as_tuple(profile.get("mcp_server_names")))
         if hasattr(profile, "mcp_server_names"):
-            return cls(mcp_server_names=list(getattr(profile, "mcp_server_names") or []))
+            return cls(mcp_server_names=_as_tuple(getattr(profile, "mcp_server_names")))
         return cls()
+
+
+def _as_tuple(values: Any) -> tuple[Any, ...]:
+    """已是 tuple 时直接复用，避免重复拷贝。"""
+    if not values:
+        return ()
+    if type(values) is tuple:
+        return values
+    return tuple(values)
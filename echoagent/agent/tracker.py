@@ -1,15 +1,18 @@
 """Runtime state tracking for agent execution operations."""
 
+import asyncio
+from collections import deque
 from contextlib import nullcontext, contextmanager
 from contextvars import ContextVar
 from dataclasses import dataclass, field
+from functools import cache, lru_cache
 import logging
 import os
 from pathlib import Path
+import sys
 import time
-import traceback
-import uuid
-from typing import Any, Dict, Optional
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterator, Mapping, Optional
 
 from agents.tracing.create import trace
 from echoagent.utils import Printer
@@ -25,6 +28,8 @@ from echoagent.artifacts.store import (
 from echoagent.observability.runlog import RunEventWriter, RunIndexBuilder, RunLog
 from echoagent.observability.runlog.utils import truncate_text
 
+logger = logging.getLogger(__name__)
+
 # Context variable to store the current runtime tracker
 # This allows tools to access the tracker without explicit parameter passing
 _current_runtime_tracker: ContextVar[Optional['RuntimeTracker']] = ContextVar(
@@ -32,41 +37,87 @@ _current_runtime_tracker: ContextVar[Optional['RuntimeTracker']] = ContextVar(
     default=None
 )
 
-_TRACE_EXPORT_FILTER_ADDED = False
+# agent step 期间的 (迭代序号, 分组 id)，状态更新时无需再沿 context 逐级读取
+_current_step_iteration: ContextVar[Optional[tuple[int, Optional[str]]]] = ContextVar(
+    'current_step_iteration',
+    default=None
+)
+
+
+
+class _StepEventBuffer:
+    """agent step 内暂存的工具事件；步骤结束或有其他事件写入前批量落盘。"""
+
+    __slots__ = ("events", "closed")
+
+    def __init__(self) -> None:
+        self.events: list[tuple[str, dict, str]] = []
+        self.closed = False
+
+
+_current_step_events: ContextVar[Optional[_StepEventBuffer]] = ContextVar(
+    'current_step_events',
+    default=None
+)
+
+# 后台 artifact 写入每批最多合并的条数
+_ARTIFACT_BATCH_SIZE = 16
+_MISSING = object()
+# 未传 span_kwargs 时共享的只读空映射，避免每个 step 分配新 dict
+_NO_SPAN_KWARGS: Mapping[str, Any] = MappingProxyType({})
+ENV_MAX_ARTIFACT_RECORDS = "ECHOAGENT_MAX_ARTIFACT_RECORDS"
+# 单次运行最多保留的 artifact 记录数，超出后丢弃最早的记录
+try:
+    _MAX_ARTIFACT_RECORDS = max(1, int(os.getenv(ENV_MAX_ARTIFACT_RECORDS, "10000")))
+except ValueError:
+    _MAX_ARTIFACT_RECORDS = 10_000
+# run 目录下的固定子目录
+_RUN_SUBDIRS = ("reports", "debug", "runlog", "snapshots")
+# ERROR 事件中保留的最内层栈帧数
+_TRACEBACK_FRAME_LIMIT = 20
+
+
+_SUPPRESSED_TRACE_WARNING = "OPENAI_API_KEY is not set, skipping trace export"
 
 
 class _TraceExportFilter(logging.Filter):
     def filter(self, record: logging.LogRecord) -> bool:
-        message = record.getMessage()
-        return "OPENAI_API_KEY is not set, skipping trace export" not in message
+        # 先查未格式化的模板；无参数时模板即最终消息，无需 getMessage 格式化
+        msg = record.msg
+        if isinstance(msg, str):
+            if _SUPPRESSED_TRACE_WARNING in msg:
+                return False
+            if not record.args:
+                return True
+        return _SUPPRESSED_TRACE_WARNING not in record.getMessage()
 
 
+@cache
 def _suppress_trace_export_warning() -> None:
-    global _TRACE_EXPORT_FILTER_ADDED
-    if _TRACE_EXPORT_FILTER_ADDED:
-        return
+    # 进程内只判断一次；之后的调用直接命中缓存
     if os.environ.get("OPENAI_API_KEY"):
         return
     logging.getLogger("openai.agents").addFilter(_TraceExportFilter())
-    _TRACE_EXPORT_FILTER_ADDED = True
 
 
-@dataclass
+@dataclass(slots=True)
 class AgentStepHandle:
     """Internal handle for coordinating tracker-managed agent step state."""
 
     step_id: Optional[str]
     span_factory: Any
     span_name: str
-    span_kwargs: Dict[str, Any] = field(default_factory=dict)
+    span_kwargs: Mapping[str, Any] = field(default_factory=dict)
     printer_key: Optional[str] = None
     full_printer_key: Optional[str] = None
     printer_title: Optional[str] = None
     printer_border_style: Optional[str] = None
     iteration_idx: int = 0
-    start_time: float = 0.0
+    group_id: Optional[str] = None
+    start_time_ns: int = 0
     span: Any = None
     agent_name: str = ""
+    event_buffer: Optional[_StepEventBuffer] = None
 
 
 def _derive_agent_metadata(
@@ -76,19 +127,36 @@ def _derive_agent_metadata(
     printer_title: Optional[str],
 ) -> tuple[str, str, Optional[str], Optional[str]]:
     """Resolve agent-related metadata with sensible defaults."""
-    agent_name = getattr(agent, "name", getattr(agent, "__class__", type("obj", (), {})).__name__)
+    agent_name = getattr(agent, "name", _MISSING)
+    if agent_name is _MISSING:
+        agent_name = type(agent).__name__
+    try:
+        return _resolve_agent_metadata(agent_name, span_name, printer_key, printer_title)
+    except TypeError:
+        # name 不可哈希时无法缓存，直接计算
+        return _resolve_agent_metadata.__wrapped__(agent_name, span_name, printer_key, printer_title)
+
 
-    resolved_span_name = span_name or str(agent_name)
-    resolved_printer_key = printer_key or str(agent_name)
+@lru_cache(maxsize=256, typed=True)
+def _resolve_agent_metadata(
+    agent_name: Any,
+    span_name: Optional[str],
+    printer_key: Optional[str],
+    printer_title: Optional[str],
+) -> tuple[str, str, Optional[str], Optional[str]]:
+    """同一 agent 在多轮迭代中参数相同，结果按参数缓存。"""
+    agent_name = str(agent_name)
+    resolved_span_name = span_name or agent_name
+    resolved_printer_key = printer_key or agent_name
 
     if printer_title:
         resolved_printer_title = printer_title
     elif printer_key:
         resolved_printer_title = printer_key
     else:
-        resolved_printer_title = str(agent_name).capitalize()
+        resolved_printer_title = agent_name.capitalize()
 
-    return str(agent_name), resolved_span_name, resolved_printer_key, resolved_printer_title
+    return agent_name, resolved_span_name, resolved_printer_key, resolved_printer_title
 
 
 class RuntimeTracker:
@@ -129,22 +197,39 @@ class RuntimeTracker:
         self.trace_sensitive = trace_sensitive
         self.experiment_id = experiment_id
         self.pipeline_slug = pipeline_slug
-        self.run_id = experiment_id or f"run-{uuid.uuid4().hex}"
+        if experiment_id:
+            self.run_id = experiment_id
+        else:
+            # 仅在未指定 experiment_id 时才需要 uuid，延迟导入
+            from uuid import uuid4
+
+            self.run_id = f"run-{uuid4().hex}"
         if self.enable_tracing:
+            # 带缓存，进程内只真正执行一次
             _suppress_trace_export_warning()
 
         # Components owned by tracker (created on-demand)
         self._printer: Optional[Printer] = None
         self._reporter: Optional[RunReporter] = None
-        self.data_store = DataStore(experiment_id=experiment_id)
-        self._artifact_settings = artifact_settings or ArtifactSettings()
+        # DataStore 在首次访问时创建，沿用构造时的 experiment_id
+        self._data_store: Optional[DataStore] = None
+        self._data_store_experiment_id = experiment_id
+        # 未传入时在首次读取 artifact 配置时再创建默认值
+        self._artifact_settings: Optional[ArtifactSettings] = artifact_settings
         self._artifact_store: Optional[ArtifactStore] = None
-        self._artifact_records: list[dict[str, Any]] = []
+        self._artifact_records: deque[dict[str, Any]] = deque(maxlen=_MAX_ARTIFACT_RECORDS)
         self._runlog: Optional[RunLog] = None
+        # 与 _runlog 同步维护；调用方据此决定是否构造事件 payload
+        self._runlog_enabled = False
         self._run_dir: Optional[Path] = None
+        self._run_dir_resolved: Optional[Path] = None
         self._run_dir_relative: Optional[str] = None
+        # record_artifact 写入 payload 的 run 目录字符串，随 run 目录一起更新
+        self._run_dir_str: Optional[str] = None
         self._outputs_dir: Optional[Path] = None
         self._tool_calls: Dict[str, str] = {}
+        self._artifact_queue: Optional[asyncio.Queue] = None
+        self._artifact_drain_task: Optional[asyncio.Task] = None
 
     @property
     def printer(self) -> Optional[Printer]:
@@ -156,14 +241,42 @@ class RuntimeTracker:
         """Get the reporter instance."""
         return self._reporter
 
+    @property
+    def data_store(self) -> DataStore:
+        """Get the pipeline-scoped data store, creating it on first access."""
+        if self._data_store is None:
+            self._data_store = DataStore(experiment_id=self._data_store_experiment_id)
+        return self._data_store
+
+    @data_store.setter
+    def data_store(self, value: DataStore) -> None:
+        self._data_store = value
+
+    @property
+    def observing(self) -> bool:
+        """是否有任何观测输出（tracing、printer、reporter 或 runlog）处于开启状态。"""
+        return (
+            self.enable_tracing
+            or self._printer is not None
+            or self._reporter is not None
+            or self._runlog is not None
+        )
+
     @property
     def artifact_settings(self) -> ArtifactSettings:
-        return self._artifact_settings
+        settings = self._artifact_settings
+        if settings is None:
+            settings = self._artifact_settings = ArtifactSettings()
+        return settings
 
     @property
     def artifact_records(self) -> list[dict[str, Any]]:
         return list(self._artifact_records)
 
+    def iter_artifact_records(self) -> Iterator[dict[str, Any]]:
+        """按写入顺序遍历 artifact 记录，不复制列表。"""
+        return iter(self._artifact_records)
+
     @property
     def run_dir(self) -> Optional[Path]:
         """返回当前 run 目录（若 runlog 已启用）。"""
@@ -179,12 +292,12 @@ class RuntimeTracker:
         self._artifact_store = None
 
     def artifacts_enabled(self) -> bool:
-        return self._artifact_settings.enabled
+        return self.artifact_settings.enabled
 
     def get_run_artifact_root(self) -> Path:
         if self._run_dir is not None:
             return self._run_dir
-        return resolve_run_artifacts_root(self.run_id, settings=self._artifact_settings)
+        return resolve_run_artifacts_root(self.run_id, settings=self.artifact_settings)
 
     def get_run_artifact_store(self) -> Optional[ArtifactStore]:
         if not self.artifacts_enabled():
@@ -195,14 +308,20 @@ class RuntimeTracker:
 
     def _ensure_run_dir(self, outputs_dir: Path) -> Path:
         run_dir = Path(outputs_dir) / "runs" / str(self.run_id)
-        for subdir in ("reports", "debug", "runlog", "snapshots"):
-            (run_dir / subdir).mkdir(parents=True, exist_ok=True)
+        # 同一 run 目录（如 reporter 重新初始化）已创建过时跳过 mkdir
+        if run_dir != self._run_dir:
+            run_dir.mkdir(parents=True, exist_ok=True)
+            for subdir in _RUN_SUBDIRS:
+                (run_dir / subdir).mkdir(exist_ok=True)
+            self._run_dir_resolved = run_dir.resolve()
         self._run_dir = run_dir
         self._run_dir_relative = str(Path("runs") / str(self.run_id))
+        self._run_dir_str = self._run_dir_relative or str(run_dir)
         self._outputs_dir = Path(outputs_dir)
         outputs_root = str(self._outputs_dir)
-        if self._artifact_settings.root_dir != outputs_root:
-            self._artifact_settings.root_dir = outputs_root
+        settings = self.artifact_settings
+        if settings.root_dir != outputs_root:
+            settings.root_dir = outputs_root
             self._artifact_store = None
         return run_dir
 
@@ -212,21 +331,47 @@ class RuntimeTracker:
             return
         try:
             run_dir = self._ensure_run_dir(Path(outputs_dir))
-            writer = RunEventWriter(run_dir / "runlog" / "runlog.jsonl", self.run_id)
+            runlog_dir = run_dir / "runlog"
+            writer = RunEventWriter(runlog_dir / "runlog.jsonl", self.run_id)
             index = RunIndexBuilder(self.run_id)
-            self._runlog = RunLog(writer, index, run_dir / "runlog" / "run_index.json")
+            self._runlog = RunLog(writer, index, runlog_dir / "run_index.json")
         except Exception:
             self._runlog = None
+        self._runlog_enabled = self._runlog is not None
 
     def emit_event(self, event_type: str, payload: dict) -> int:
         """写入 runlog 事件，失败返回 -1。"""
-        if self._runlog is None:
+        if not self._runlog_enabled:
             return -1
+        buffer = _current_step_events.get()
+        if buffer is not None and buffer.events:
+            # 先落盘本步骤暂存的事件，保持 seq 与发生顺序一致
+            self._flush_step_events(buffer)
         try:
             return self._runlog.emit(event_type, payload)
         except Exception:
             return -1
 
+    def _emit_step_event(self, event_type: str, payload: dict) -> None:
+        """步骤内的高频事件先暂存，由 _flush_step_events 合并写入。"""
+        buffer = _current_step_events.get()
+        if buffer is None or buffer.closed or self._runlog is None:
+            self.emit_event(event_type, payload)
+            return
+        buffer.events.append((event_type, payload, self._runlog.now()))
+
+    def _flush_step_events(self, buffer: _StepEventBuffer) -> None:
+        events = buffer.events
+        if not events:
+            return
+        buffer.events = []
+        if self._runlog is None:
+            return
+        try:
+            self._runlog.emit_many(events)
+        except Exception:
+            pass
+
     def end_runlog(self) -> None:
         """关闭 runlog，失败不抛异常。"""
         if self._runlog is None:
@@ -236,45 +381,103 @@ class RuntimeTracker:
         except Exception:
             pass
         self._runlog = None
+        self._runlog_enabled = False
 
     def record_artifact(self, ref: ArtifactRef, *, event_type: Optional[str] = None) -> None:
-        relative_path = ref.path or self._resolve_relative_artifact_path(ref)
+        relative_path = ref.path
+        resolved: Optional[Path] = None
+        if not relative_path:
+            relative_path, resolved = self._resolve_relative_artifact_path(ref)
         if relative_path:
             ref.path = relative_path
+        artifact = ref.to_dict()
         self._artifact_records.append(
             {
                 "type": event_type,
-                "artifact": ref.to_dict(),
+                "artifact": artifact,
             }
         )
+        if not self._runlog_enabled:
+            return
         payload = {
             "type": event_type or "artifact",
-            "artifact": ref.to_dict(),
+            "artifact": artifact,
         }
-        run_dir_value = self._run_dir_relative or (str(self._run_dir) if self._run_dir else None)
-        if run_dir_value:
-            payload["run_dir"] = run_dir_value
+        if self._run_dir_str:
+            payload["run_dir"] = self._run_dir_str
         if relative_path:
             payload["path"] = relative_path
-        resolved_path = _resolve_artifact_path(ref)
+        # 已解析过的绝对路径直接复用，避免重复 resolve
+        resolved_path = str(resolved) if resolved is not None else _resolve_artifact_path(ref)
         if resolved_path:
             payload["resolved_path"] = resolved_path
         self.emit_event("ARTIFACT_WRITTEN", payload)
 
-    def _resolve_relative_artifact_path(self, ref: ArtifactRef) -> Optional[str]:
-        if self._run_dir is None:
-            return None
+    def submit_artifact_write(
+        self,
+        write: Callable[[], ArtifactRef],
+        *,
+        event_type: Optional[str] = None,
+    ) -> None:
+        """提交 artifact 写入；有事件循环时交给后台任务，否则同步执行。"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.record_artifact(write(), event_type=event_type)
+            return
+        task = self._artifact_drain_task
+        if self._artifact_queue is None or task is None or task.done() or task.get_loop() is not loop:
+            self._artifact_queue = asyncio.Queue()
+            self._artifact_drain_task = loop.create_task(
+                self._drain_artifacts(self._artifact_queue)
+            )
+        self._artifact_queue.put_nowait((write, event_type))
+
+    async def flush_artifacts(self) -> None:
+        """等待已提交的 artifact 全部落盘。"""
+        queue = self._artifact_queue
+        task = self._artifact_drain_task
+        if queue is None or task is None or task.done():
+            return
+        if task.get_loop() is not asyncio.get_running_loop():
+            return
+        await queue.join()
+
+    async def _drain_artifacts(self, queue: asyncio.Queue) -> None:
+        # 队列取空即退出，空闲时不留挂起任务持有 tracker；之后的提交会重新创建任务
+        while not queue.empty():
+            batch = [queue.get_nowait()]
+            while len(batch) < _ARTIFACT_BATCH_SIZE and not queue.empty():
+                batch.append(queue.get_nowait())
+            try:
+                results = await asyncio.to_thread(_run_artifact_writes, batch)
+                for ref, event_type in results:
+                    try:
+                        self.record_artifact(ref, event_type=event_type)
+                    except Exception:
+                        logger.exception("Failed to record artifact")
+            except Exception:
+                logger.exception("Failed to write artifact batch")
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    def _resolve_relative_artifact_path(self, ref: ArtifactRef) -> tuple[Optional[str], Optional[Path]]:
+        """返回 (相对 run 目录的路径, 已解析的绝对路径)；后者仅在实际 resolve 过时非空。"""
+        if self._run_dir is None or self._run_dir_resolved is None:
+            return None, None
         uri = getattr(ref, "uri", None)
         if not uri:
-            return None
+            return None, None
+        resolved: Optional[Path] = None
         try:
             path = Path(str(uri))
             if not path.is_absolute():
-                return str(path)
-            run_dir = self._run_dir.resolve()
-            return str(path.resolve().relative_to(run_dir))
+                return str(path), None
+            resolved = path.resolve()
+            return str(resolved.relative_to(self._run_dir_resolved)), resolved
         except Exception:
-            return None
+            return None, resolved
 
     @property
     def current_iteration_index(self) -> int:
@@ -283,6 +486,9 @@ class RuntimeTracker:
         Returns:
             Current iteration index, or 0 if no iteration is active
         """
+        step_iteration = _current_step_iteration.get()
+        if step_iteration is not None:
+            return step_iteration[0]
         if self.context and hasattr(self.context, 'state'):
             try:
                 return self.context.state.current_iteration.index
@@ -290,6 +496,14 @@ class RuntimeTracker:
                 pass
         return 0
 
+    def _iteration_group(self) -> tuple[int, Optional[str]]:
+        """返回当前迭代序号及其分组 id（序号为 0 时无分组）。"""
+        step_iteration = _current_step_iteration.get()
+        if step_iteration is not None:
+            return step_iteration
+        iteration_idx = self.current_iteration_index
+        return iteration_idx, _iter_group_id(iteration_idx) if iteration_idx > 0 else None
+
     def start_agent_step(
         self,
         *,
@@ -309,18 +523,20 @@ class RuntimeTracker:
             printer_title,
         )
 
-        iteration_idx = self.current_iteration_index
+        iteration_idx, group_id = self._iteration_group()
         step_id: Optional[str] = None
+        # 同一次时钟读数既用于计时，也作为 step_id 的唯一后缀
+        start_time_ns = time.monotonic_ns()
 
         if self._reporter or self._runlog:
-            step_id = f"{iteration_idx}-{resolved_span_name}-{time.time_ns()}"
+            step_id = f"{iteration_idx}-{resolved_span_name}-{start_time_ns}"
         if self._reporter:
             self._reporter.record_agent_step_start(
                 step_id=step_id,
-                agent_name=str(agent_name),
+                agent_name=agent_name,
                 span_name=resolved_span_name,
                 iteration=iteration_idx,
-                group_id=f"iter-{iteration_idx}" if iteration_idx > 0 else None,
+                group_id=group_id,
                 printer_title=resolved_printer_title,
             )
 
@@ -332,14 +548,15 @@ class RuntimeTracker:
                 "Working...",
                 title=resolved_printer_title,
                 border_style=printer_border_style,
+                group_id=group_id,
             )
 
-        if step_id is not None:
+        if step_id is not None and self._runlog_enabled:
             self.emit_event(
                 "AGENT_STEP_START",
                 {
                     "step_id": step_id,
-                    "agent_name": str(agent_name),
+                    "agent_name": agent_name,
                     "span_name": resolved_span_name,
                     "iteration": iteration_idx,
                     "status": "running",
@@ -350,14 +567,15 @@ class RuntimeTracker:
             step_id=step_id,
             span_factory=span_factory,
             span_name=resolved_span_name,
-            span_kwargs=dict(span_kwargs or {}),
+            span_kwargs=span_kwargs if span_kwargs is not None else _NO_SPAN_KWARGS,
             printer_key=resolved_printer_key,
             full_printer_key=full_printer_key,
             printer_title=resolved_printer_title,
             printer_border_style=printer_border_style,
             iteration_idx=iteration_idx,
-            start_time=time.perf_counter(),
-            agent_name=str(agent_name),
+            group_id=group_id,
+            start_time_ns=start_time_ns,
+            agent_name=agent_name,
         )
 
     def finish_agent_step(
@@ -370,6 +588,11 @@ class RuntimeTracker:
         failure_message: str = "Failed",
     ) -> None:
         """Finalize tracker state for an agent step."""
+        buffer = handle.event_buffer
+        if buffer is not None:
+            # 步骤结束后到达的工具事件（如后台任务）直接写入
+            buffer.closed = True
+            self._flush_step_events(buffer)
         if handle.full_printer_key:
             message = success_message if status == "success" else failure_message
             self.update_printer(
@@ -378,9 +601,10 @@ class RuntimeTracker:
                 is_done=True,
                 title=handle.printer_title,
                 border_style=handle.printer_border_style,
+                iteration_idx=handle.iteration_idx,
             )
 
-        duration_seconds = time.perf_counter() - handle.start_time
+        duration_seconds = (time.monotonic_ns() - handle.start_time_ns) / 1e9
         if self._reporter and handle.step_id is not None:
             self._reporter.record_agent_step_end(
                 step_id=handle.step_id,
@@ -388,7 +612,7 @@ class RuntimeTracker:
                 duration_seconds=duration_seconds,
                 error=error,
             )
-        if handle.step_id is not None:
+        if handle.step_id is not None and self._runlog_enabled:
             self.emit_event(
                 "AGENT_STEP_END",
                 {
@@ -412,25 +636,31 @@ class RuntimeTracker:
         _ = state
         if tool_call is None:
             return
-        meta = {}
-        if hasattr(tool_call, "meta") and isinstance(tool_call.meta, dict):
-            meta.update(tool_call.meta)
-        tool_name = _select_first(
-            getattr(tool_call, "name", None),
-            getattr(tool_call, "tool_name", None),
-            meta.get("tool_name"),
-            meta.get("tool"),
-            meta.get("name"),
+        # 只读 meta，无需复制；候选字段按顺序短路求值
+        meta = getattr(tool_call, "meta", None)
+        if not isinstance(meta, dict):
+            meta = {}
+        tool_name = (
+            getattr(tool_call, "name", None)
+            or getattr(tool_call, "tool_name", None)
+            or meta.get("tool_name")
+            or meta.get("tool")
+            or meta.get("name")
+            or None
         )
-        call_id = _select_first(
-            getattr(tool_call, "call_id", None),
-            meta.get("call_id"),
-            meta.get("id"),
+        call_id = (
+            getattr(tool_call, "call_id", None)
+            or meta.get("call_id")
+            or meta.get("id")
+            or None
         )
         if tool_name and call_id:
-            self._tool_calls[str(call_id)] = str(tool_name)
+            self._tool_calls[_as_str(call_id)] = _as_str(tool_name)
+        if not self._runlog_enabled:
+            return
+        # 参数序列化只服务于 runlog，未开启时整体跳过
         args_text = truncate_text(serialize_content(getattr(tool_call, "args", None)), 2000)
-        self.emit_event(
+        self._emit_step_event(
             "TOOL_CALL",
             {
                 "tool_name": tool_name,
@@ -456,38 +686,43 @@ class RuntimeTracker:
         meta = {}
         if hasattr(tool_result, "meta") and isinstance(tool_result.meta, dict):
             meta.update(tool_result.meta)
-        tool_name = _select_first(
-            meta.get("tool_name"),
-            meta.get("tool"),
-            meta.get("name"),
-            getattr(tool_result, "tool_name", None),
-            getattr(tool_result, "name", None),
+        tool_name = (
+            meta.get("tool_name")
+            or meta.get("tool")
+            or meta.get("name")
+            or getattr(tool_result, "tool_name", None)
+            or getattr(tool_result, "name", None)
+            or None
         )
-        call_id = _select_first(
-            meta.get("call_id"),
-            meta.get("id"),
-            getattr(tool_result, "call_id", None),
+        call_id = (
+            meta.get("call_id")
+            or meta.get("id")
+            or getattr(tool_result, "call_id", None)
+            or None
         )
-        if not tool_name and call_id:
-            tool_name = self._tool_calls.get(str(call_id))
+        # call_id 只做一次 str 转换，查表与清理共用
+        call_key = _as_str(call_id) if call_id else None
+        if not tool_name and call_key:
+            tool_name = self._tool_calls.get(call_key)
         if tool_name and "tool_name" not in meta:
             meta["tool_name"] = tool_name
         if call_id and "call_id" not in meta:
             meta["call_id"] = call_id
         if callable(record_event):
             record_event("TOOL_RESULT", content, meta=meta)
-        payload = {
-            "tool_name": tool_name,
-            "call_id": call_id,
-            "ok": getattr(tool_result, "ok", None),
-        }
-        if "duration_seconds" in meta:
-            payload["duration_seconds"] = meta.get("duration_seconds")
-        if getattr(tool_result, "error", None) is not None:
-            payload["error"] = str(getattr(tool_result, "error", None))
-        self.emit_event("TOOL_RESULT", payload)
-        if call_id:
-            self._tool_calls.pop(str(call_id), None)
+        if self._runlog_enabled:
+            payload = {
+                "tool_name": tool_name,
+                "call_id": call_id,
+                "ok": getattr(tool_result, "ok", None),
+            }
+            if "duration_seconds" in meta:
+                payload["duration_seconds"] = meta.get("duration_seconds")
+            if getattr(tool_result, "error", None) is not None:
+                payload["error"] = str(getattr(tool_result, "error", None))
+            self._emit_step_event("TOOL_RESULT", payload)
+        if call_key:
+            self._tool_calls.pop(call_key, None)
 
     def on_model_output(
         self,
@@ -506,11 +741,9 @@ class RuntimeTracker:
     def on_error(self, state: Optional[Any], error: Exception) -> None:
         """编排器错误事件钩子，仅用于运行时跟踪。"""
         _ = state
-        if error is None:
+        if error is None or not self._runlog_enabled:
             return
-        traceback_text = "".join(
-            traceback.format_exception(type(error), error, error.__traceback__)
-        )
+        traceback_text = _format_error_traceback(error)
         self.emit_event(
             "ERROR",
             {
@@ -530,11 +763,26 @@ class RuntimeTracker:
     @contextmanager
     def span_scope(self, handle: AgentStepHandle):
         """Context manager for span lifecycle tied to an agent step handle."""
-        kwargs = dict(handle.span_kwargs)
-        kwargs.setdefault("name", handle.span_name)
-        with self.span_context(handle.span_factory, **kwargs) as span:
-            handle.span = span
-            yield span
+        span_kwargs = handle.span_kwargs
+        token = _current_step_iteration.set((handle.iteration_idx, handle.group_id))
+        events_token = None
+        if self._runlog_enabled:
+            handle.event_buffer = _StepEventBuffer()
+            events_token = _current_step_events.set(handle.event_buffer)
+        try:
+            if "name" in span_kwargs:
+                span_cm = self.span_context(handle.span_factory, **span_kwargs)
+            else:
+                span_cm = self.span_context(
+                    handle.span_factory, name=handle.span_name, **span_kwargs
+                )
+            with span_cm as span:
+                handle.span = span
+                yield span
+        finally:
+            if events_token is not None:
+                _current_step_events.reset(events_token)
+            _current_step_iteration.reset(token)
 
     def log_agent_panel(self, handle: AgentStepHandle, content: str) -> None:
         """Render a standalone panel for the agent output if configured."""
@@ -598,7 +846,7 @@ class RuntimeTracker:
                 run_id=self.run_id,
                 console=self.console,
                 artifact_store=artifact_store,
-                artifact_settings=self._artifact_settings,
+                artifact_settings=self.artifact_settings,
             )
         self._reporter.start(config)
         return self._reporter
@@ -625,7 +873,7 @@ class RuntimeTracker:
                 title=title,
                 border_style=border_style,
             )
-        if iteration is not None:
+        if iteration is not None and self._runlog_enabled:
             self.emit_event(
                 "ITERATION_START",
                 {
@@ -656,6 +904,8 @@ class RuntimeTracker:
                 is_done=is_done,
                 title=title,
             )
+        if not self._runlog_enabled:
+            return
         resolved_iteration = iteration
         if resolved_iteration is None:
             resolved_iteration = _extract_iteration_index(group_id)
@@ -705,6 +955,7 @@ class RuntimeTracker:
         title: Optional[str] = None,
         border_style: Optional[str] = None,
         group_id: Optional[str] = None,
+        iteration_idx: Optional[int] = None,
     ) -> None:
         """Update printer status if printer is active.
 
@@ -716,15 +967,22 @@ class RuntimeTracker:
             title: Optional panel title
             border_style: Optional border color
             group_id: Optional group to nest this item in
+            iteration_idx: Known iteration index; skips reading it from context
         """
+        reporter = self._reporter
+        printer = self._printer
+        if reporter is None and printer is None:
+            return
+
         # Auto-derive group_id from current iteration if not explicitly provided
         if group_id is None:
-            iteration_idx = self.current_iteration_index
-            if iteration_idx > 0:
-                group_id = f"iter-{iteration_idx}"
+            if iteration_idx is None:
+                group_id = self._iteration_group()[1]
+            elif iteration_idx > 0:
+                group_id = _iter_group_id(iteration_idx)
 
-        if self.reporter:
-            self.reporter.record_status_update(
+        if reporter:
+            reporter.record_status_update(
                 item_id=key,
                 content=message,
                 is_done=is_done,
@@ -732,8 +990,8 @@ class RuntimeTracker:
                 border_style=border_style,
                 group_id=group_id,
             )
-        if self.printer:
-            self.printer.update_item(
+        if printer:
+            printer.update_item(
                 key,
                 message,
                 is_done=is_done,
@@ -753,36 +1011,43 @@ class RuntimeTracker:
         group_id: Optional[str] = None,
     ) -> None:
         """Proxy helper for rendering standalone panels via the printer."""
+        reporter = self._reporter
+        printer = self._printer
+        if reporter is None and printer is None and not self._runlog_enabled:
+            return
+
         # Auto-derive group_id from iteration if not provided
         if group_id is None and iteration is None:
-            iteration = self.current_iteration_index if self.current_iteration_index > 0 else None
+            iteration_idx, group_id = self._iteration_group()
+            iteration = iteration_idx if iteration_idx > 0 else None
 
         if group_id is None and iteration is not None:
-            group_id = f"iter-{iteration}"
+            group_id = _iter_group_id(iteration)
 
-        if self.reporter:
-            self.reporter.record_panel(
+        if reporter:
+            reporter.record_panel(
                 title=title,
                 content=content,
                 border_style=border_style,
                 iteration=iteration,
                 group_id=group_id,
             )
-        if self.printer:
-            self.printer.log_panel(
+        if printer:
+            printer.log_panel(
                 title,
                 content,
                 border_style=border_style,
                 iteration=iteration,
                 group_id=group_id,
             )
-        panel_payload = {
-            "title": title,
-            "content": truncate_text(content, 4000),
-            "iteration": iteration,
-            "group_id": group_id,
-        }
-        self.emit_event("PANEL", panel_payload)
+        if self._runlog_enabled:
+            panel_payload = {
+                "title": title,
+                "content": truncate_text(content, 4000),
+                "iteration": iteration,
+                "group_id": group_id,
+            }
+            self.emit_event("PANEL", panel_payload)
 
     @contextmanager
     def activate(self):
@@ -795,6 +1060,10 @@ class RuntimeTracker:
                 # tools can now access this tracker
                 result = await agent.run(...)
         """
+        # 已是当前 tracker（嵌套激活）时无需再 set/reset
+        if _current_runtime_tracker.get() is self:
+            yield self
+            return
         token = _current_runtime_tracker.set(self)
         try:
             yield self
@@ -811,20 +1080,50 @@ def get_current_tracker() -> Optional[RuntimeTracker]:
     return _current_runtime_tracker.get()
 
 
+def _as_str(value: Any) -> str:
+    return value if type(value) is str else str(value)
+
+
+@lru_cache(maxsize=256)
+def _iter_group_id(idx: int) -> str:
+    """迭代分组 id（``iter-N``），按序号缓存并驻留。"""
+    return sys.intern(f"iter-{idx}")
+
+
 def _extract_iteration_index(group_id: Optional[str]) -> Optional[int]:
-    if not group_id or not group_id.startswith("iter-"):
+    if not group_id:
         return None
-    try:
-        return int(group_id.split("iter-", 1)[1])
-    except Exception:
+    suffix = group_id.removeprefix("iter-")
+    if suffix is group_id or not suffix.isdecimal():
         return None
+    return int(suffix)
 
 
-def _select_first(*values: Any) -> Optional[Any]:
-    for value in values:
-        if value not in (None, ""):
-            return value
-    return None
+def _format_error_traceback(error: BaseException) -> str:
+    """只格式化最内层若干帧，且不展开 __cause__/__context__ 链。"""
+    import traceback  # 仅在出错路径使用，延迟导入
+
+    summary = traceback.StackSummary.extract(
+        traceback.walk_tb(error.__traceback__),
+        limit=-_TRACEBACK_FRAME_LIMIT,
+    )
+    parts = ["Traceback (most recent call last):\n"] if summary else []
+    parts.extend(summary.format())
+    parts.extend(traceback.format_exception_only(type(error), error))
+    return "".join(parts)
+
+
+def _run_artifact_writes(
+    batch: list[tuple[Callable[[], ArtifactRef], Optional[str]]],
+) -> list[tuple[ArtifactRef, Optional[str]]]:
+    """在工作线程中批量执行写入；单条失败不影响其余条目。"""
+    results: list[tuple[ArtifactRef, Optional[str]]] = []
+    for write, event_type in batch:
+        try:
+            results.append((write(), event_type))
+        except Exception:
+            logger.exception("Failed to write artifact")
+    return results
 
 
 def _resolve_artifact_path(ref: ArtifactRef) -> Optional[str]:
@@ -1,23 +1,34 @@
 from __future__ import annotations
 
+import sys
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, Union
 
 
-RUN_START = "RUN_START"
-USER_MESSAGE = "USER_MESSAGE"
-ASSISTANT_MESSAGE = "ASSISTANT_MESSAGE"
-MODEL_OUTPUT = "MODEL_OUTPUT"
-PARSE_RESULT = "PARSE_RESULT"
-ERROR = "ERROR"
-RUN_END = "RUN_END"
-TOOL_OUTPUT = "TOOL_OUTPUT"
-TOOL_RESULT = "TOOL_RESULT"
+# 事件类型常量显式驻留，分发表查找可直接命中指针相等
+RUN_START = sys.intern("RUN_START")
+USER_MESSAGE = sys.intern("USER_MESSAGE")
+ASSISTANT_MESSAGE = sys.intern("ASSISTANT_MESSAGE")
+MODEL_OUTPUT = sys.intern("MODEL_OUTPUT")
+PARSE_RESULT = sys.intern("PARSE_RESULT")
+ERROR = sys.intern("ERROR")
+RUN_END = sys.intern("RUN_END")
+TOOL_OUTPUT = sys.intern("TOOL_OUTPUT")
+TOOL_RESULT = sys.intern("TOOL_RESULT")
 
 
-@dataclass
+@dataclass(slots=True)
 class RunEvent:
     type: str
     payload: dict[str, Any]
-    ts: float
+    ts: int  # 纳秒时间戳（time.time_ns）
     run_id: str
+
+    @classmethod
+    def from_tuple(cls, item: tuple[str, dict[str, Any], int, str]) -> "RunEvent":
+        """由 ``(type, payload, ts, run_id)`` 元组构造事件。"""
+        event_type, payload, ts, run_id = item
+        return cls(type=event_type, payload=payload, ts=ts, run_id=run_id)
+
+
+RawRunEvent = Union[RunEvent, tuple[str, dict[str, Any], int, str]]
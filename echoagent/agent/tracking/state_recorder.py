@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Any, Iterable
+from typing import Any, Callable, Iterable, Optional
 
 from echoagent.agent.tracking.events import (
     ASSISTANT_MESSAGE,
@@ -9,6 +9,7 @@ from echoagent.agent.tracking.events import (
     TOOL_OUTPUT,
     TOOL_RESULT,
     USER_MESSAGE,
+    RawRunEvent,
     RunEvent,
 )
 from echoagent.utils.helpers import serialize_content
@@ -17,24 +18,44 @@ from echoagent.utils.helpers import serialize_content
 class StateRecorder:
     """统一处理运行事件并写入状态。"""
 
-    def consume(self, context: Any, events: Iterable[RunEvent]) -> None:
+    def __init__(self) -> None:
+        # 事件类型 -> 处理方法，每个事件只做一次 dict 查找
+        self._handlers = {
+            MODEL_OUTPUT: self._record_output,
+            TOOL_OUTPUT: self._record_output,
+            TOOL_RESULT: self._record_tool_result,
+            USER_MESSAGE: self._record_user_message,
+            ASSISTANT_MESSAGE: self._record_assistant_message,
+            ERROR: self._record_error,
+        }
+
+    def consume(self, context: Any, events: Iterable[RawRunEvent]) -> None:
+        """消费运行事件；接受 ``RunEvent`` 或 ``(type, payload, ts, run_id)`` 元组。"""
+        if not events:
+            return
         state = getattr(context, "state", None)
         if state is None:
             return
+        record_event = getattr(state, "record_event", None)
+        if not callable(record_event):
+            record_event = None
 
+        handlers = self._handlers
         for event in events:
-            if event.type in (MODEL_OUTPUT, TOOL_OUTPUT):
-                self._record_output(state, event)
-            elif event.type == TOOL_RESULT:
-                self._record_tool_result(state, event)
-            elif event.type == USER_MESSAGE:
-                self._record_user_message(state, event)
-            elif event.type == ASSISTANT_MESSAGE:
-                self._record_assistant_message(state, event)
-            elif event.type == ERROR:
-                self._record_error(state, event)
-
-    def _record_output(self, state: Any, event: RunEvent) -> None:
+            if isinstance(event, tuple):
+                handler = handlers.get(event[0])
+                if handler is None:
+                    continue
+                event = RunEvent.from_tuple(event)
+            else:
+                handler = handlers.get(event.type)
+                if handler is None:
+                    continue
+            handler(state, record_event, event)
+
+    def _record_output(
+        self, state: Any, record_event: Optional[Callable[..., Any]], event: RunEvent
+    ) -> None:
         payload = event.payload
         output = payload.get("output")
         record_payload = payload.get("record_payload", False)
@@ -57,16 +78,13 @@ class StateRecorder:
                 except Exception:
                     pass
 
-        if output is None:
-            return
-        record_event = getattr(state, "record_event", None)
-        if not callable(record_event):
+        if output is None or record_event is None:
             return
 
         content = serialize_content(output)
         if content:
             record_event(
-                "ASSISTANT_MESSAGE",
+                ASSISTANT_MESSAGE,
                 content,
                 meta={
                     "agent_name": payload.get("agent_name"),
@@ -75,7 +93,7 @@ class StateRecorder:
             )
         if record_tool_output and content:
             record_event(
-                "TOOL_RESULT",
+                TOOL_RESULT,
                 content,
                 meta={
                     "tool_name": payload.get("tool_name") or payload.get("agent_name"),
@@ -84,43 +102,48 @@ class StateRecorder:
                 },
             )
 
-    def _record_user_message(self, state: Any, event: RunEvent) -> None:
+    def _record_user_message(
+        self, state: Any, record_event: Optional[Callable[..., Any]], event: RunEvent
+    ) -> None:
         payload = event.payload
         content = payload.get("content")
-        record_event = getattr(state, "record_event", None)
-        if not callable(record_event) or not content:
+        if record_event is None or not content:
             return
         record_event(
-            "USER_MESSAGE",
+            USER_MESSAGE,
             content,
             meta=payload.get("meta") or {},
         )
 
-    def _record_assistant_message(self, state: Any, event: RunEvent) -> None:
+    def _record_assistant_message(
+        self, state: Any, record_event: Optional[Callable[..., Any]], event: RunEvent
+    ) -> None:
         payload = event.payload
         content = payload.get("content")
-        record_event = getattr(state, "record_event", None)
-        if not callable(record_event) or not content:
+        if record_event is None or not content:
             return
         record_event(
-            "ASSISTANT_MESSAGE",
+            ASSISTANT_MESSAGE,
             content,
             meta=payload.get("meta") or {},
         )
 
-    def _record_tool_result(self, state: Any, event: RunEvent) -> None:
+    def _record_tool_result(
+        self, state: Any, record_event: Optional[Callable[..., Any]], event: RunEvent
+    ) -> None:
         payload = event.payload
         content = payload.get("content")
-        record_event = getattr(state, "record_event", None)
-        if not callable(record_event) or not content:
+        if record_event is None or not content:
             return
         record_event(
-            "TOOL_RESULT",
+            TOOL_RESULT,
             content,
             meta=payload.get("meta") or {},
         )
 
-    def _record_error(self, state: Any, event: RunEvent) -> None:
+    def _record_error(
+        self, state: Any, record_event: Optional[Callable[..., Any]], event: RunEvent
+    ) -> None:
         record_error = getattr(state, "record_error", None)
         if not callable(record_error):
             return
@@ -154,7 +154,7 @@ def record_parse_failure(
     schema_name: Optional[str],
     error_type: Optional[str],
     error_message: Optional[str],
-    traceback_text: Optional[str],
+    traceback_text: Optional[Any],
     handler_name: str,
     error_detail: Optional[dict[str, Any]] = None,
     meta: Optional[dict[str, Any]] = None,
@@ -184,7 +184,7 @@ def record_parse_failure(
         "schema_name": schema_name,
         "error_type": error_type,
         "error_message": error_message,
-        "traceback": traceback_text,
+        "traceback": str(traceback_text) if traceback_text is not None else None,
         "raw_text_path": raw_ref.path or raw_ref.uri,
         "meta": {
             "handler": handler_name,
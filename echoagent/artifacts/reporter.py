@@ -114,15 +114,9 @@ class RunReporter:
         group_id: Optional[str],
     ) -> None:
         """Currently unused; maintained for interface compatibility."""
-        with self._lock:
-            self._artifact_writer.record_status_update(
-                item_id=item_id,
-                content=content,
-                is_done=is_done,
-                title=title,
-                border_style=border_style,
-                group_id=group_id,
-            )
+        # ArtifactWriter 不记录状态更新；这是最高频的 reporter 调用，
+        # 直接返回以免每次都获取锁并转发一次空操作。
+        return None
 
     def record_group_start(
         self,
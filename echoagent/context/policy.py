@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field, replace
+from dataclasses import dataclass, field
 from typing import Any, Mapping, Optional
 
 
@@ -115,10 +115,14 @@ def _normalize_block_policy(value: Any) -> BlockPolicy:
     return BlockPolicy(enabled=bool(enabled), max_chars=max_chars)
 
 
+_DEFAULT_BLOCK_POLICY = BlockPolicy()
+
+
 def apply_block_policy(block_name: str, policy: ContextPolicy) -> Optional[BlockPolicy]:
-    if not policy.is_enabled(block_name):
-        return None
+    # BlockPolicy 为 frozen dataclass，可直接共享，无需复制
     block_policy = policy.blocks.get(block_name)
     if block_policy is None:
-        return BlockPolicy()
-    return replace(block_policy)
+        return _DEFAULT_BLOCK_POLICY
+    if not block_policy.enabled:
+        return None
+    return block_policy
@@ -22,14 +22,7 @@ class RunLog:
         try:
             if not type:
                 return -1
-            event = {
-                "schema_version": 1,
-                "run_id": self._run_id,
-                "seq": None,
-                "ts": _utc_timestamp(),
-                "type": type,
-                "payload": payload,
-            }
+            event = self._build_event(type, payload, _utc_timestamp())
             seq = self._writer.write(event)
             if seq == -1:
                 return -1
@@ -39,6 +32,35 @@ class RunLog:
         except Exception:
             return -1
 
+    @staticmethod
+    def now() -> str:
+        """事件时间戳；延迟写入的调用方应在事件发生时取值。"""
+        return _utc_timestamp()
+
+    def emit_many(self, items: list[tuple[str, dict, str]]) -> list[int]:
+        """批量写入 (type, payload, ts) 事件，顺序与 items 一致；失败项返回 -1。"""
+        try:
+            events = [self._build_event(type, payload, ts) for type, payload, ts in items if type]
+            seqs = self._writer.write_many(events)
+            for event, seq in zip(events, seqs):
+                if seq == -1:
+                    continue
+                event["seq"] = seq
+                self._index.on_event(event, seq)
+            return seqs
+        except Exception:
+            return [-1] * len(items)
+
+    def _build_event(self, type: str, payload: dict, ts: str) -> dict:
+        return {
+            "schema_version": 1,
+            "run_id": self._run_id,
+            "seq": None,
+            "ts": ts,
+            "type": type,
+            "payload": payload,
+        }
+
     def close(self) -> None:
         try:
             payload = self._index.finalize()
@@ -1,53 +1,201 @@
 from __future__ import annotations
 
 import json
+import os
+import queue
 import threading
+import time
+import weakref
 from pathlib import Path
 from typing import Any, Optional
 
 from echoagent.observability.runlog.utils import safe_json
 
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖，缺失时回退到标准库 json
+    orjson = None
+
+ENV_RUNLOG_BATCH_SIZE = "ECHOAGENT_RUNLOG_BATCH_SIZE"
+ENV_RUNLOG_BATCH_MS = "ECHOAGENT_RUNLOG_BATCH_MS"
+
+
+def _env_int(name: str, default: int, *, minimum: int) -> int:
+    try:
+        value = int(os.getenv(name, ""))
+    except ValueError:
+        return default
+    return value if value >= minimum else default
+
+
+# 后台线程每批最多合并的行数，以及首行到达后最多等待的时间
+_BATCH_SIZE = _env_int(ENV_RUNLOG_BATCH_SIZE, 64, minimum=1)
+_BATCH_SECONDS = _env_int(ENV_RUNLOG_BATCH_MS, 50, minimum=0) / 1000
+
+_STOP = object()
+# 直接以追加模式打开文件描述符，绕过 Python 文本 I/O 层
+_OPEN_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_APPEND | getattr(os, "O_BINARY", 0)
+
+
+def _dumps_line(value: Any) -> bytes:
+    """编码为紧凑 JSON 行（UTF-8）；orjson 不支持的值（如超出 64 位的整数）回退到标准库。"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(value, option=orjson.OPT_APPEND_NEWLINE)
+        except TypeError:
+            pass
+    return (json.dumps(value, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def _drain(pending: "queue.Queue[Any]", fd: int) -> None:
+    """后台线程主循环；只持有队列与 fd，不引用写入器本身。"""
+    while True:
+        item = pending.get()
+        if item is _STOP:
+            pending.task_done()
+            return
+        batch = [item]
+        stop = False
+        deadline = time.monotonic() + _BATCH_SECONDS
+        while len(batch) < _BATCH_SIZE:
+            timeout = deadline - time.monotonic()
+            try:
+                item = pending.get(timeout=timeout) if timeout > 0 else pending.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                stop = True
+                break
+            batch.append(item)
+        _write_batch(fd, batch)
+        for _ in range(len(batch) + stop):
+            pending.task_done()
+        if stop:
+            return
+
+
+def _write_batch(fd: int, lines: list[bytes]) -> None:
+    try:
+        view = memoryview(b"".join(lines))
+        while view:
+            written = os.write(fd, view)
+            view = view[written:]
+    except Exception:
+        pass
+
+
+def _release(pending: "queue.Queue[Any]", thread: Optional[threading.Thread], fd: int) -> None:
+    """停止后台线程（先写完队列中的行）并关闭 fd；由 close、GC 或进程退出触发，只执行一次。"""
+    if thread is not None:
+        pending.put(_STOP)
+        thread.join()
+    try:
+        os.close(fd)
+    except Exception:
+        pass
+
 
 class RunEventWriter:
-    """事件流写入器，失败时不抛异常。"""
+    """事件流写入器，失败时不抛异常。
+
+    序列化与 seq 分配在调用方线程完成，落盘交给后台线程批量写入。
+    未调用 close 的写入器在被回收或进程退出时仍会写完队列并释放 fd。
+    """
 
     def __init__(self, path: Path, run_id: str) -> None:
         self.path = Path(path)
         self.run_id = str(run_id)
         self._seq = 0
         self._lock = threading.Lock()
-        self._handle: Optional[Any] = None
+        self._fd: Optional[int] = None
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._finalizer: Optional[weakref.finalize] = None
         try:
             self.path.parent.mkdir(parents=True, exist_ok=True)
-            self._handle = self.path.open("a", encoding="utf-8")
+            self._fd = os.open(os.fspath(self.path), _OPEN_FLAGS, 0o644)
         except Exception:
-            self._handle = None
+            self._fd = None
+            return
+        self._finalizer = weakref.finalize(self, _release, self._queue, None, self._fd)
 
     def write(self, event: dict) -> int:
-        if self._handle is None:
-            return -1
         with self._lock:
+            # 在锁内检查，避免与 close 竞争时为已关闭的写入器重新启动线程
+            if self._fd is None:
+                return -1
             try:
-                payload = dict(event)
-                seq = payload.get("seq")
-                if not isinstance(seq, int):
-                    self._seq += 1
-                    seq = self._seq
-                    payload["seq"] = seq
-                else:
-                    self._seq = max(self._seq, seq)
-                payload.setdefault("run_id", self.run_id)
-                line = json.dumps(safe_json(payload), ensure_ascii=False, separators=(",", ":"))
-                self._handle.write(line + "\n")
-                self._handle.flush()
-                return int(seq)
+                seq, line = self._encode(event)
+                self._ensure_thread()
+                self._queue.put_nowait(line)
+                return seq
             except Exception:
                 return -1
 
+    def write_many(self, events: list[dict]) -> list[int]:
+        """批量写入，整批作为一个队列条目提交；单条失败记为 -1。"""
+        seqs: list[int] = []
+        lines: list[bytes] = []
+        with self._lock:
+            if self._fd is None:
+                return [-1] * len(events)
+            for event in events:
+                try:
+                    seq, line = self._encode(event)
+                except Exception:
+                    seqs.append(-1)
+                    continue
+                seqs.append(seq)
+                lines.append(line)
+            if lines:
+                try:
+                    self._ensure_thread()
+                    self._queue.put_nowait(b"".join(lines))
+                except Exception:
+                    return [-1] * len(events)
+        return seqs
+
+    def flush(self) -> None:
+        """阻塞直到已提交的事件全部写入文件。"""
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            self._queue.join()
+
     def close(self) -> None:
-        try:
-            if self._handle is not None:
-                self._handle.close()
-        except Exception:
-            pass
-        self._handle = None
+        with self._lock:
+            finalizer = self._finalizer
+            if finalizer is not None:
+                finalizer()
+            self._finalizer = None
+            self._thread = None
+            self._fd = None
+
+    def _encode(self, event: dict) -> tuple[int, bytes]:
+        # 调用方需持有 self._lock
+        payload = dict(event)
+        seq = payload.get("seq")
+        if not isinstance(seq, int):
+            self._seq += 1
+            seq = self._seq
+            payload["seq"] = seq
+        else:
+            self._seq = max(self._seq, seq)
+        payload.setdefault("run_id", self.run_id)
+        return int(seq), _dumps_line(safe_json(payload))
+
+    def _ensure_thread(self) -> None:
+        # 调用方需持有 self._lock，且 self._fd 非空
+        if self._thread is not None:
+            return
+        thread = threading.Thread(
+            target=_drain,
+            args=(self._queue, self._fd),
+            name=f"runlog-writer-{self.run_id}",
+            daemon=True,
+        )
+        thread.start()
+        self._thread = thread
+        # 线程启动后改为先停线程再关 fd 的收尾
+        if self._finalizer is not None:
+            self._finalizer.detach()
+        self._finalizer = weakref.finalize(self, _release, self._queue, thread, self._fd)
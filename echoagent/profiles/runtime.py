@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from dataclasses import replace
 from typing import Any, Mapping
 
 from echoagent.context.policy import normalize_context_policy
@@ -118,7 +119,10 @@ def _apply_tool_conflict_policy(tools: list[ToolSpec], conflict_policy: ToolConf
 
 # 原: echoagent/profiles/resolver.py:240-270 → 新: echoagent/profiles/runtime.py
 def normalize_model(model_data: Any) -> ModelSpec:
+    """归一化模型配置；空白字符串模型统一为 None，调用方只需判断 None。"""
     if isinstance(model_data, ModelSpec):
+        if _is_blank_model(model_data.model):
+            return replace(model_data, model=None)
         return model_data
     if isinstance(model_data, Mapping):
         provider = model_data.get("provider") or "openai"
@@ -126,6 +130,8 @@ def normalize_model(model_data: Any) -> ModelSpec:
         api_key_env = model_data.get("api_key_env")
         params = model_data.get("params") or {}
         model_value = model_data.get("model")
+        if _is_blank_model(model_value):
+            model_value = None
         return ModelSpec(
             provider=provider,
             model=model_value,
@@ -133,9 +139,15 @@ def normalize_model(model_data: Any) -> ModelSpec:
             api_key_env=api_key_env,
             params=dict(params),
         )
+    if _is_blank_model(model_data):
+        model_data = None
     return ModelSpec(provider="openai", model=model_data)
 
 
+def _is_blank_model(model: Any) -> bool:
+    return isinstance(model, str) and not model.strip()
+
+
 # 原: echoagent/profiles/profile_types.py:147-156 → 新: echoagent/profiles/runtime.py
 def runtime_tools(tool_specs: list[ToolSpec]) -> list[Any]:
     tools: list[Any] = []
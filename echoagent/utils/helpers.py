@@ -3,8 +3,11 @@ Miscellaneous helper utilities.
 """
 
 import datetime
+import enum
 import json
-from typing import Any, Optional
+import types
+from functools import lru_cache
+from typing import Annotated, Any, Literal, Optional, Union, get_args, get_origin
 
 from pydantic import BaseModel
 
@@ -49,6 +52,62 @@ def serialize_content(value: Any) -> str:
         return str(value)
 
 
+_IMMUTABLE_SCALARS = (
+    str,
+    int,
+    float,
+    complex,
+    bytes,
+    type(None),
+    datetime.date,
+    datetime.time,
+    datetime.timedelta,
+    enum.Enum,
+)
+
+
+@lru_cache(maxsize=256)
+def is_deeply_frozen_model(model_class: type) -> bool:
+    """Return True if instances of a pydantic model class can never change after validation.
+
+    ``frozen=True`` only blocks field reassignment; nested lists, dicts or sets stay
+    mutable in place. This checks that every field annotation is itself immutable
+    (scalars, enums, literals, tuples, frozensets, or nested models passing this check).
+    """
+    return _is_frozen_model(model_class, frozenset())
+
+
+def _is_frozen_model(model_class: type, seen: frozenset) -> bool:
+    if model_class in seen:
+        return True
+    config = getattr(model_class, "model_config", None)
+    fields = getattr(model_class, "model_fields", None)
+    if not isinstance(config, dict) or not isinstance(fields, dict):
+        return False
+    if not config.get("frozen") or config.get("extra") == "allow":
+        return False
+    seen = seen | {model_class}
+    return all(_is_immutable_annotation(field.annotation, seen) for field in fields.values())
+
+
+def _is_immutable_annotation(annotation: Any, seen: frozenset) -> bool:
+    if annotation is None:
+        return True
+    origin = get_origin(annotation)
+    if origin is Annotated:
+        return _is_immutable_annotation(get_args(annotation)[0], seen)
+    if origin is Literal:
+        return True
+    if origin in (Union, types.UnionType, tuple, frozenset):
+        args = [arg for arg in get_args(annotation) if arg is not Ellipsis]
+        return bool(args) and all(_is_immutable_annotation(arg, seen) for arg in args)
+    if origin is not None or not isinstance(annotation, type):
+        return False
+    if issubclass(annotation, _IMMUTABLE_SCALARS):
+        return True
+    return _is_frozen_model(annotation, seen)
+
+
 def parse_to_model(
     raw_output: Any,
     model_class: type[BaseModel],
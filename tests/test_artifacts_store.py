@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import json
 from pathlib import Path
 
@@ -119,3 +120,52 @@ def test_record_llm_output(tmp_path: Path) -> None:
     )
 
     assert Path(ref.uri).read_text(encoding="utf-8") == "hello"
+
+
+def test_tracker_flushes_queued_artifact_writes(tmp_path: Path) -> None:
+    tracker = RuntimeTracker(
+        console=None,
+        artifact_settings=ArtifactSettings(root_dir=str(tmp_path)),
+    )
+    store = FileSystemArtifactStore(tmp_path)
+    written: list[ArtifactRef] = []
+
+    def _write() -> ArtifactRef:
+        ref = store.put_text("queued.txt", "hello")
+        written.append(ref)
+        return ref
+
+    async def _run() -> None:
+        tracker.submit_artifact_write(_write, event_type="llm_output")
+        assert tracker.artifact_records == []
+        await tracker.flush_artifacts()
+
+    asyncio.run(_run())
+
+    records = tracker.artifact_records
+    assert [record["type"] for record in records] == ["llm_output"]
+    assert store.resolve(written[0]).read_text(encoding="utf-8") == "hello"
+
+
+def test_tracker_artifact_drain_exits_when_idle(tmp_path: Path) -> None:
+    tracker = RuntimeTracker(
+        console=None,
+        artifact_settings=ArtifactSettings(root_dir=str(tmp_path)),
+    )
+    store = FileSystemArtifactStore(tmp_path)
+
+    def _broken() -> ArtifactRef:
+        raise OSError("disk full")
+
+    async def _run() -> None:
+        tracker.submit_artifact_write(_broken, event_type="llm_output")
+        tracker.submit_artifact_write(
+            lambda: store.put_text("ok.txt", "ok"), event_type="llm_output"
+        )
+        await tracker.flush_artifacts()
+        await asyncio.sleep(0)
+        assert tracker._artifact_drain_task.done()
+
+    asyncio.run(_run())
+
+    assert [record["type"] for record in tracker.artifact_records] == ["llm_output"]
@@ -101,3 +101,31 @@ def test_context_agent_orchestrator_runner_error(tmp_path) -> None:
         asyncio.run(agent("payload", tracker=tracker))
 
     assert state.errors == ["boom"]
+
+
+def test_echo_agent_resolves_profile_per_instance() -> None:
+    profile = make_profile(runtime_template="Summary: {summary}")
+    context = make_context(profile=profile, state=make_state(summary="sum", profile=profile))
+
+    first = EchoAgent(context=context, profile="test", llm="dummy", runner=FakeRunner())
+    second = EchoAgent(context=context, profile="test", llm="dummy", runner=FakeRunner())
+
+    assert first._profile is not second._profile
+    assert first._policies is not second._policies
+    assert first.tools is not second.tools
+
+    profile.instructions = "Edited instructions."
+    third = EchoAgent(context=context, profile="test", llm="dummy", runner=FakeRunner())
+
+    assert third.instructions == "Edited instructions."
+
+
+def test_echo_agent_step_defaults_follow_name_changes() -> None:
+    profile = make_profile(runtime_template="Summary: {summary}")
+    context = make_context(profile=profile, state=make_state(summary="sum", profile=profile))
+    agent = EchoAgent(context=context, profile="test", llm="dummy", runner=FakeRunner())
+
+    agent.name = "renamed"
+    agent._refresh_step_defaults()
+
+    assert agent._run_meta["agent_name"] == "renamed"
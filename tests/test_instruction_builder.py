@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from pydantic import BaseModel, ConfigDict
+
 from echoagent.agent.prompting.instruction_builder import InstructionBuilder
 from tests.utils import add_iteration, make_profile, make_state, make_tool_output
 
@@ -35,3 +37,55 @@ def test_instruction_builder_includes_tool_results() -> None:
     result = builder.build(state, profile, runtime={"payload": None})
 
     assert "tool-out" in result
+
+
+def test_instruction_builder_static_instructions() -> None:
+    builder = InstructionBuilder()
+    static_profile = make_profile(runtime_template="Do the task.")
+    dynamic_profile = make_profile(runtime_template="Summary: {summary}")
+    state = make_state(profile=static_profile)
+
+    assert builder.static_instructions(static_profile) == builder.build(
+        state, static_profile, runtime={"payload": "task"}
+    )
+    assert builder.static_instructions(dynamic_profile) is None
+    assert builder.static_instructions(make_profile(runtime_template="")) is None
+
+
+def test_instruction_builder_reuses_frozen_payload_serialization() -> None:
+    class FrozenPayload(BaseModel):
+        model_config = ConfigDict(frozen=True)
+        task: str
+
+    class MutablePayload(BaseModel):
+        task: str
+
+    frozen = FrozenPayload(task="a")
+    first = InstructionBuilder._serialize_payload(frozen)
+    assert InstructionBuilder._serialize_payload(frozen) is first
+
+    mutable = MutablePayload(task="a")
+    assert InstructionBuilder._serialize_payload(mutable) == '{"task":"a"}'
+    mutable.task = "b"
+    assert InstructionBuilder._serialize_payload(mutable) == '{"task":"b"}'
+
+
+def test_instruction_builder_sees_nested_changes_in_frozen_payload() -> None:
+    class FrozenListPayload(BaseModel):
+        model_config = ConfigDict(frozen=True)
+        items: list[str]
+
+    payload = FrozenListPayload(items=["a"])
+    assert InstructionBuilder._serialize_payload(payload) == '{"items":["a"]}'
+    payload.items.append("b")
+    assert InstructionBuilder._serialize_payload(payload) == '{"items":["a","b"]}'
+
+
+def test_instruction_builder_dict_payload_keeps_non_ascii(monkeypatch) -> None:
+    from echoagent.agent.prompting import instruction_builder
+
+    payload = {"任务": "分析数据"}
+    expected = '{"任务":"分析数据"}'
+    assert InstructionBuilder._serialize_payload(payload) == expected
+    monkeypatch.setattr(instruction_builder, "orjson", None)
+    assert InstructionBuilder._serialize_payload(payload) == expected
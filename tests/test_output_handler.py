@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+import asyncio
+
 import pytest
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 from echoagent.agent.output_handler import OutputHandler
 from echoagent.profiles.base import ToolAgentOutput
@@ -72,3 +74,39 @@ def test_output_handler_strict_tool_output_fallback() -> None:
 
     assert parsed.ok is True
     assert parsed.value.output == "[1]"
+
+
+class FrozenSchema(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    a: int
+
+
+class FrozenListSchema(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    items: list[str]
+
+
+def test_output_handler_reuses_frozen_parse_only() -> None:
+    handler = OutputHandler()
+
+    first = handler.parse('{"a": 5}', schema=FrozenSchema, mode="strict")
+    second = handler.parse('{"a": 5}', schema=FrozenSchema, mode="strict")
+    assert second.value is first.value
+
+    mutable = handler.parse('{"a": 5}', schema=SampleSchema, mode="strict")
+    mutable.value.a = 6
+    again = handler.parse('{"a": 5}', schema=SampleSchema, mode="strict")
+    assert again.value.a == 5
+    assert again.value is not mutable.value
+
+
+def test_output_handler_does_not_share_frozen_parse_with_mutable_fields() -> None:
+    handler = OutputHandler()
+
+    first = handler.parse('{"items": ["x"]}', schema=FrozenListSchema, mode="strict")
+    first.value.items.append("POISON")
+    second = handler.parse('{"items": ["x"]}', schema=FrozenListSchema, mode="strict")
+
+    assert second.value.items == ["x"]
@@ -85,3 +85,18 @@ def test_runlog_writes_index_and_jsonl(tmp_path) -> None:
         if event["type"] == "ARTIFACT_WRITTEN" and event["payload"].get("type") == "run_report"
     )
     assert run_report_seq < run_end_seq
+
+
+def test_runlog_writer_flushes_batched_events(tmp_path) -> None:
+    runlog_path = tmp_path / "runlog.jsonl"
+    writer = RunEventWriter(runlog_path, "run-batch")
+
+    seqs = [writer.write({"type": "PANEL", "payload": {"n": n}}) for n in range(100)]
+    writer.flush()
+
+    lines = runlog_path.read_text(encoding="utf-8").splitlines()
+    assert seqs == list(range(1, 101))
+    assert [json.loads(line)["seq"] for line in lines] == seqs
+
+    writer.close()
+    assert writer.write({"type": "PANEL", "payload": {}}) == -1
@@ -30,7 +30,7 @@ def test_state_recorder_records_payload_and_tool_output() -> None:
             "record_payload": True,
             "record_tool_output": True,
         },
-        ts=time.time(),
+        ts=time.time_ns(),
         run_id="run-1",
     )
 
@@ -49,7 +49,7 @@ def test_state_recorder_records_error() -> None:
     event = RunEvent(
         type=ERROR,
         payload={"error": ValueError("boom")},
-        ts=time.time(),
+        ts=time.time_ns(),
         run_id="run-2",
     )
 
@@ -66,7 +66,7 @@ def test_state_recorder_records_user_message_event() -> None:
     event = RunEvent(
         type=USER_MESSAGE,
         payload={"content": "hi"},
-        ts=time.time(),
+        ts=time.time_ns(),
         run_id="run-3",
     )
 
@@ -74,3 +74,19 @@ def test_state_recorder_records_user_message_event() -> None:
 
     assert state.events
     assert state.events[0].type == "USER_MESSAGE"
+
+
+def test_state_recorder_accepts_tuple_events() -> None:
+    state = ErrorState()
+    context = SimpleNamespace(state=state)
+    recorder = StateRecorder()
+
+    recorder.consume(
+        context,
+        [
+            ("RUN_START", {"agent_name": "a"}, time.time_ns(), "run-4"),
+            (ERROR, {"error": ValueError("boom")}, time.time_ns(), "run-4"),
+        ],
+    )
+
+    assert state.errors == ["boom"]
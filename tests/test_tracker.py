@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import json
+from types import SimpleNamespace
+
 from echoagent.agent.tracker import RuntimeTracker
 from echoagent.artifacts.models import ArtifactSettings
 from tests.utils import make_state, make_tool_output
@@ -16,3 +19,34 @@ def test_tracker_does_not_mutate_state() -> None:
     tracker.on_model_output(state, output, record_payload=True, record_tool_output=True)
 
     assert len(state.iterations) == 0
+
+
+def test_tracker_batches_tool_events_within_step(tmp_path) -> None:
+    tracker = RuntimeTracker(
+        console=None,
+        enable_tracing=False,
+        artifact_settings=ArtifactSettings(enabled=False),
+    )
+    tracker.start_runlog(outputs_dir=tmp_path)
+    agent = SimpleNamespace(name="worker")
+    handle = tracker.start_agent_step(agent=agent, span_name=None, span_factory=None)
+    with tracker.span_scope(handle):
+        tracker.on_tool_call(None, SimpleNamespace(name="search", call_id="c1", args={"q": "x"}))
+        tracker.on_tool_result(None, SimpleNamespace(meta={"call_id": "c1"}, data="ok", ok=True))
+        assert len(handle.event_buffer.events) == 2
+        tracker.log_panel("Worker", "done")
+        assert handle.event_buffer.events == []
+    tracker.finish_agent_step(handle, status="success")
+    tracker.end_runlog()
+
+    lines = (tracker.run_dir / "runlog" / "runlog.jsonl").read_text(encoding="utf-8").splitlines()
+    events = [json.loads(line) for line in lines]
+    assert [event["type"] for event in events] == [
+        "AGENT_STEP_START",
+        "TOOL_CALL",
+        "TOOL_RESULT",
+        "PANEL",
+        "AGENT_STEP_END",
+    ]
+    assert [event["seq"] for event in events] == [1, 2, 3, 4, 5]
+    assert events[2]["payload"]["tool_name"] == "search"